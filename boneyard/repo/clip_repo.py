@@ -1,5 +1,7 @@
 # boneyard/repo/clip_repo.py
 from sqlalchemy.ext.asyncio import AsyncSession
+import json
+
 from sqlalchemy import text
 
 
@@ -23,3 +25,43 @@ class ClipRepo:
         result = await self.session.execute(sql, {"clip_id": clip_id})
         row = result.fetchone()
         return ClipModel(**dict(row)) if row else None
+
+    async def get_clips_with_bars_and_notes(self, clip_ids: list[int]) -> list[dict]:
+        """
+        Load clips with their bars and notes in one query.
+        Each row is a clip with a "bars" JSON array (ordered by bar_index),
+        each bar carrying a "notes" JSON array (ordered by start_unit).
+        """
+        sql = text("""
+            SELECT c.id, COALESCE(bars_agg.bars, '[]'::json) AS bars
+            FROM clips c
+            LEFT JOIN LATERAL (
+                SELECT json_agg(
+                    jsonb_build_object(
+                        'id', cb.id,
+                        'bar_index', cb.bar_index,
+                        'velocity_curve', cb.velocity_curve,
+                        'cc', cb.cc,
+                        'pitch_bend_curve', cb.pitch_bend_curve,
+                        'aftertouch_curve', cb.aftertouch_curve,
+                        'pedal_events', cb.pedal_events,
+                        'metadata', cb.metadata,
+                        'notes', COALESCE(
+                            (SELECT json_agg(n.* ORDER BY n.start_unit)
+                             FROM notes n WHERE n.clip_bar_id = cb.id),
+                            '[]'::json
+                        )
+                    )
+                    ORDER BY cb.bar_index
+                ) AS bars
+                FROM clip_bar cb
+                WHERE cb.clip_id = c.id
+            ) bars_agg ON true
+            WHERE c.id = ANY(:clip_ids)
+        """)
+        result = await self.session.execute(sql, {"clip_ids": list(clip_ids)})
+        clips = []
+        for row in result.mappings():
+            bars = row["bars"]
+            clips.append({"id": row["id"], "bars": json.loads(bars) if isinstance(bars, str) else bars})
+        return clips
@@ -1,4 +1,6 @@
 # boneyard/repo/composition_repo.py
+import json
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from src.repo.models import CompositionModel
@@ -24,3 +26,52 @@ class CompositionRepo:
         result = await self.session.execute(sql, {"name": name})
         row = result.fetchone()
         return CompositionModel(**dict(row)) if row else None
+
+    async def load_full_tree(self, composition_id: int) -> dict | None:
+        """
+        Load composition -> tracks -> track_bars and every referenced
+        clip -> clip_bars -> notes in a single statement, as one JSON document.
+        """
+        sql = text("""
+            SELECT jsonb_build_object(
+                'id', c.id,
+                'ticks_per_quarter', c.ticks_per_quarter,
+                'tempo_bpm', c.tempo_bpm,
+                'tracks', COALESCE((
+                    SELECT jsonb_agg(jsonb_build_object(
+                        'id', t.id,
+                        'name', t.name,
+                        'bars', COALESCE((
+                            SELECT jsonb_agg(to_jsonb(tb) ORDER BY tb.bar_index)
+                            FROM track_bar tb WHERE tb.track_id = t.id
+                        ), '[]'::jsonb)
+                    ) ORDER BY t.position, t.id)
+                    FROM track t WHERE t.composition_id = c.id
+                ), '[]'::jsonb),
+                'clips', COALESCE((
+                    SELECT jsonb_agg(jsonb_build_object(
+                        'id', cl.id,
+                        'bars', COALESCE((
+                            SELECT jsonb_agg(to_jsonb(cb) || jsonb_build_object(
+                                'notes', COALESCE((
+                                    SELECT jsonb_agg(to_jsonb(n) ORDER BY n.start_unit)
+                                    FROM notes n WHERE n.clip_bar_id = cb.id
+                                ), '[]'::jsonb)
+                            ) ORDER BY cb.bar_index)
+                            FROM clip_bar cb WHERE cb.clip_id = cl.id
+                        ), '[]'::jsonb)
+                    ))
+                    FROM clips cl
+                    WHERE cl.id IN (
+                        SELECT tb.clip_id FROM track_bar tb
+                        JOIN track t ON t.id = tb.track_id
+                        WHERE t.composition_id = c.id
+                    )
+                ), '[]'::jsonb)
+            ) AS tree
+            FROM composition c
+            WHERE c.id = :composition_id
+        """)
+        result = await self.session.execute(sql, {"composition_id": composition_id})
+        tree = result.scalar()
+        return json.loads(tree) if isinstance(tree, str) else tree
@@ -7,7 +7,11 @@ from src.repo.models import DatabaseLogin
 
 class Database:
     def __init__(self, dsn: DatabaseLogin):
-        self.engine = create_async_engine(dsn.toURL(), echo=False, future=True)
+        self.engine = create_async_engine(
+            dsn.toURL(), echo=False, future=True,
+            # keep asyncpg's per-connection prepared statements for repeated INSERTs
+            connect_args={"prepared_statement_cache_size": 500, "statement_cache_size": 500},
+        )
         self.session_factory = sessionmaker(self.engine,  expire_on_commit=False, class_=AsyncSession ) # type: ignore
 
     async def get_session(self):
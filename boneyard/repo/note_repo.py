@@ -3,26 +3,38 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from src.repo.models import NoteModel
 
+# Built once at import so every call reuses the same statement (and the
+# driver's prepared statement) instead of re-creating the text construct
+NOTE_INSERT = text("""
+    INSERT INTO notes
+    (bar_id, start_unit, duration_units, pitch_name, octave,
+     velocity, articulation, is_rest,
+     expression, microtiming_offset, metadata)
+    VALUES (:bar_id, :start_unit, :duration_units, :pitch_name, :octave,
+            :velocity, :articulation, :is_rest,
+            :expression, :microtiming_offset, :metadata)
+""")
+NOTE_INSERT_RETURNING = text(NOTE_INSERT.text + "RETURNING id\n")
+
 class NoteRepo:
     def __init__(self, session: AsyncSession):
         self.session = session
 
     async def create_note(self, note: NoteModel) -> int:
-        sql = text("""
-            INSERT INTO notes
-            (bar_id, start_unit, duration_units, pitch_name, octave,
-             velocity, articulation, is_rest,
-             expression, microtiming_offset, metadata)
-            VALUES (:bar_id, :start_unit, :duration_units, :pitch_name, :octave,
-                    :velocity, :articulation, :is_rest,
-                    :expression, :microtiming_offset, :metadata)
-            RETURNING id
-        """)
-        result = await self.session.execute(sql, note.dict())
+        result = await self.session.execute(NOTE_INSERT_RETURNING, note.dict())
         note_id = result.scalar()
         await self.session.commit()
         return note_id
 
+    async def bulk_create_notes(self, notes: list[NoteModel]) -> None:
+        """
+        Insert many notes with a single executemany INSERT (no RETURNING).
+        """
+        if not notes:
+            return
+        await self.session.execute(NOTE_INSERT, [note.model_dump() for note in notes])
+        await self.session.commit()
+
     async def get_notes_by_bar(self, bar_id: int) -> list[NoteModel]:
         sql = text("SELECT * FROM notes WHERE bar_id = :bar_id ORDER BY start_unit")
         result = await self.session.execute(sql, {"bar_id": bar_id})
@@ -1,8 +1,15 @@
 # boneyard/repo/voice_bar_repo.py
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
+from sqlalchemy import text, table, column
+from sqlalchemy.dialects.postgresql import insert
 from src.repo.models import VoiceBarModel
 
+voice_bar_table = table(
+    "voice_bar",
+    column("id"), column("clip_id"), column("bar_number"),
+    column("time_signature_numerator"), column("time_signature_denominator"), column("metadata"),
+)
+
 class VoiceBarRepo:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -19,6 +26,19 @@ class VoiceBarRepo:
         await self.session.commit()
         return bar_id
 
+    async def bulk_create_voice_bars(self, models: list[VoiceBarModel]) -> list[int]:
+        """
+        Insert many voice bars in one executemany round-trip.
+        Returns the new ids in the same order as models.
+        """
+        if not models:
+            return []
+        stmt = insert(voice_bar_table).returning(voice_bar_table.c.id, sort_by_parameter_order=True)
+        result = await self.session.execute(stmt, [vb.model_dump(exclude={"id"}) for vb in models])
+        bar_ids = list(result.scalars().all())
+        await self.session.commit()
+        return bar_ids
+
     async def get_voice_bar_by_id(self, bar_id: int) -> VoiceBarModel:
         sql = text("SELECT * FROM voice_bar WHERE id = :bar_id")
         result = await self.session.execute(sql, {"bar_id": bar_id})
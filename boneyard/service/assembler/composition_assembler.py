@@ -1,58 +1,76 @@
-from src.repo.clip_bar_repo import ClipBarRepo
+import asyncio
+from collections import defaultdict
+from operator import itemgetter
+
 from src.repo.clip_repo import ClipRepo
 from src.repo.composition_repo import CompositionRepo
-from src.repo.note_repo import NoteRepo
 from src.repo.track_bar_repo import TrackBarRepo
 from src.repo.track_repo import TrackRepo
+from src.services.cache import LRUCache, register_clip_cache
 from src.service.assembler.data_classes import Composition, TrackBarRef, Note, Bar, Clip, Track
 
+# Required Note fields and every Bar curve field, in dataclass field order
+_NOTE_FIELDS = itemgetter("start_unit", "duration_units", "midi_pitch", "velocity", "is_rest")
+_BAR_FIELDS = itemgetter(
+    "velocity_curve", "cc", "pitch_bend_curve", "aftertouch_curve", "pedal_events", "metadata"
+)
 
-class CompositionAssembler:
-    def __init__(self, session):
-        self.session = session
-
-        self.comp_repo = CompositionRepo(session)
-        self.track_repo = TrackRepo(session)
-        self.track_bar_repo = TrackBarRepo(session)
-        self.clip_repo = ClipRepo(session)          # you already have this
-        self.clip_bar_repo = ClipBarRepo(session)   # and this
-        self.note_repo = NoteRepo(session)
-
-    async def load_composition(self, composition_id: int) -> Composition:
-        # 1. Load composition metadata
-        comp = await self.comp_repo.get_composition(composition_id)
 
-        # 2. Load tracks
-        tracks = await self.track_repo.get_tracks_for_composition(composition_id)
+class CompositionAssembler:
+    def __init__(self, session_factory, clip_cache_size: int = 10_000):
+        # A single AsyncSession cannot run queries concurrently, so each
+        # independent query opens its own short-lived session from the factory
+        # (e.g. Database.session_factory)
+        self.session_factory = session_factory
+
+        # Assembled clips are reused across load_composition calls; ClipService
+        # evicts entries when a clip is written or deleted
+        self._clip_cache = register_clip_cache(LRUCache(maxsize=clip_cache_size))
+
+    async def _query(self, repo_cls, method: str, *args):
+        async with self.session_factory() as session:
+            return await getattr(repo_cls(session), method)(*args)
+
+    async def load_composition(self, composition_id: int, single_query: bool = False) -> Composition:
+        if single_query:
+            # Whole traversal server-side in one round-trip, bypassing _load_clips
+            tree = await self._query(CompositionRepo, "load_full_tree", composition_id)
+            return self._composition_from_tree(tree)
+
+        # 1-2. Load composition metadata and tracks concurrently
+        comp, tracks = await asyncio.gather(
+            self._query(CompositionRepo, "get_composition", composition_id),
+            self._query(TrackRepo, "get_tracks_for_composition", composition_id),
+        )
 
         # 3. Load track_bar rows for all tracks
-        tbars_by_track = await self.track_bar_repo.get_by_tracks([t.id for t in tracks])
+        tbars_by_track = await self._query(TrackBarRepo, "get_by_tracks", [t.id for t in tracks])
 
-        # 4. Determine which clips are required
-        clip_ids = {tb.clip_id for tb in tbars_by_track}
+        # 4. Determine which clips are required (deduplicated, in first-use order;
+        #    bound as a single array parameter by ClipRepo's "id = ANY(:clip_ids)")
+        clip_ids = list(dict.fromkeys(tb.clip_id for tb in tbars_by_track))
 
         # 5. Load clips + bars + notes
         clip_map = await self._load_clips(clip_ids)
 
-        # 6. Build Track objects
-        track_objs = []
-        for t in tracks:
-            our_tbars = [tb for tb in tbars_by_track if tb.track_id == t.id]
-
-            track_objs.append(
-                Track(
-                    id=t.id,
-                    name=t.name,
-                    bars=[
-                        TrackBarRef(
-                            bar_index=tb.bar_index,
-                            clip=clip_map[tb.clip_id]
-                        )
-                        for tb in our_tbars
-                    ]
-                )
+        # 6. Bucket each track's TrackBarRefs in a single pass over the rows
+        #    (keeps the DB's row order; no ORDER BY track_id is assumed);
+        #    names used in the hot loop are bound to locals once
+        _TrackBarRef = TrackBarRef
+        _clip_map_get = clip_map.__getitem__
+        refs_by_track_id = defaultdict(list)
+        for tb in tbars_by_track:
+            refs_by_track_id[tb.track_id].append(
+                _TrackBarRef(bar_index=tb.bar_index, clip=_clip_map_get(tb.clip_id))
             )
 
+        _Track = Track
+        _refs_get = refs_by_track_id.get
+        track_objs = [
+            _Track(id=t.id, name=t.name, bars=_refs_get(t.id, []))
+            for t in tracks
+        ]
+
         # 7. Assemble composition
         return Composition(
             id=composition_id,
@@ -66,51 +84,75 @@ class CompositionAssembler:
         Load Clip → ClipBars → Notes and attach all MIDI expression curves.
         Returns a dict: clip_id → Clip object
         """
-        # Load data from DB
-        clips = await self.clip_repo.get_clips(clip_ids)
-        clip_bars = await self.clip_bar_repo.get_bars_by_clips(clip_ids)
-        notes = await self.note_repo.get_notes_by_clips(clip_ids)
-
-        # Group notes by clip_bar_id
-        notes_by_bar = {}
-        for n in notes:
-            notes_by_bar.setdefault(n.clip_bar_id, []).append(
-                Note(
-                    start_unit=n.start_unit,
-                    duration_units=n.duration_units,
-                    midi_pitch=n.midi_pitch,
-                    velocity=n.velocity,
-                    is_rest=n.is_rest,
-                    articulation=n.articulation,
-                    expression=n.expression,
-                    microtiming_offset=n.microtiming_offset,
-                    metadata=n.metadata
-                )
-            )
+        # Serve warm clips from the cache and only query the misses
+        hits = {i: self._clip_cache.get(i) for i in clip_ids if i in self._clip_cache}
+        misses = [i for i in clip_ids if i not in hits]
+        if not misses:
+            return hits
 
-        # Group ClipBars by clip_id
-        bars_by_clip = {}
-        for b in clip_bars:
-            bars_by_clip.setdefault(b.clip_id, []).append(
-                Bar(
-                    notes=notes_by_bar.get(b.id, []),
-                    velocity_curve=b.velocity_curve,
-                    cc=b.cc,
-                    pitch_bend_curve=b.pitch_bend_curve,
-                    aftertouch_curve=b.aftertouch_curve,
-                    pedal_events=b.pedal_events,
-                    metadata=b.metadata
-                )
-            )
+        # One query: each clip row arrives with its bars and their notes
+        # already aggregated into JSON by Postgres (ordered by bar_index / start_unit)
+        rows = await self._query(ClipRepo, "get_clips_with_bars_and_notes", misses)
 
-        # Build final Clip objects
-        clip_map = {
-            c.id: Clip(
-                id=c.id,
-                bars=bars_by_clip.get(c.id, [])
-            )
-            for c in clips
-        }
+        loaded = {row["id"]: self._clip_from_json(row) for row in rows}
+
+        for clip_id, clip in loaded.items():
+            self._clip_cache.put(clip_id, clip)
 
-        return clip_map
+        return hits | loaded
 
+    def _composition_from_tree(self, tree: dict) -> Composition:
+        """Build the dataclass tree from CompositionRepo.load_full_tree's JSON."""
+        clip_map = {}
+        for clip_json in tree["clips"]:
+            clip = self._clip_from_json(clip_json)
+            self._clip_cache.put(clip.id, clip)
+            clip_map[clip.id] = clip
+
+        _TrackBarRef = TrackBarRef
+        _clip_map_get = clip_map.__getitem__
+        return Composition(
+            id=tree["id"],
+            ticks_per_quarter=tree["ticks_per_quarter"],
+            tempo_bpm=tree["tempo_bpm"],
+            tracks=[
+                Track(
+                    id=t["id"],
+                    name=t["name"],
+                    bars=[
+                        _TrackBarRef(bar_index=tb["bar_index"], clip=_clip_map_get(tb["clip_id"]))
+                        for tb in t["bars"]
+                    ]
+                )
+                for t in tree["tracks"]
+            ]
+        )
+
+    @staticmethod
+    def _clip_from_json(row: dict) -> Clip:
+        """Build a Clip from a clip JSON object with nested bars and notes."""
+        # Hot loop for large compositions: constructors and field getters are
+        # bound once, and dataclasses are built positionally (field order)
+        _Note = Note
+        _note_fields = _NOTE_FIELDS
+        _Bar = Bar
+        _bar_fields = _BAR_FIELDS
+        return Clip(
+            id=row["id"],
+            bars=[
+                _Bar(
+                    [
+                        _Note(
+                            *_note_fields(n),
+                            n.get("articulation"),
+                            n.get("expression"),
+                            n.get("microtiming_offset"),
+                            n.get("metadata")
+                        )
+                        for n in b["notes"]
+                    ],
+                    *_bar_fields(b)
+                )
+                for b in row["bars"]
+            ]
+        )
@@ -1,35 +1,45 @@
 from dataclasses import dataclass
-from typing import List
+from typing import Any, Dict, List, Optional
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Note:
     start_unit: int
     duration_units: int
     midi_pitch: int
     velocity: int
     is_rest: bool = False
+    articulation: Optional[str] = None
+    expression: Optional[Any] = None
+    microtiming_offset: Optional[int] = None
+    metadata: Optional[Dict] = None
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Bar:
     notes: List[Note]
+    velocity_curve: Optional[List[Dict]] = None
+    cc: Optional[Dict] = None
+    pitch_bend_curve: Optional[List[Dict]] = None
+    aftertouch_curve: Optional[List[Dict]] = None
+    pedal_events: Optional[List[Dict]] = None
+    metadata: Optional[Dict] = None
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Clip:
     id: int
     bars: List[Bar]
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TrackBarRef:
     bar_index: int
     clip: Clip
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Track:
     id: int
     name: str
     bars: List[TrackBarRef]
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Composition:
     id: int
     ticks_per_quarter: int
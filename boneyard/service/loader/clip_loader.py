@@ -17,21 +17,24 @@ class ClipBuilder:
         clip_model = ClipModel(**clip_data)
         clip_id = await self.clip_repo.create_clip(clip_model)
 
-        # Step 2: create VoiceBars
-        for vb_data in clip_data.get("voice_bars", []):
-            vb_model = VoiceBarModel(
+        # Step 2: create all VoiceBars in one batch
+        voice_bars = clip_data.get("voice_bars", [])
+        bar_ids = await self.vb_repo.bulk_create_voice_bars([
+            VoiceBarModel(
                 clip_id=clip_id,
                 bar_number=vb_data["bar_number"],
                 time_signature_numerator=vb_data.get("time_signature_numerator", 4),
                 time_signature_denominator=vb_data.get("time_signature_denominator", 4),
                 metadata=vb_data.get("metadata"),
             )
+            for vb_data in voice_bars
+        ])
 
-            bar_id = await self.vb_repo.create_voice_bar(vb_model)
-
-            # Step 3: create Notes
+        # Step 3: create every bar's Notes in one batch, joined to the returned bar ids
+        note_models = []
+        for bar_id, vb_data in zip(bar_ids, voice_bars):
             for note_data in vb_data.get("notes", []):
-                note_model = NoteModel(
+                note_models.append(NoteModel(
                     bar_id=bar_id,
                     start_unit=note_data["start_unit"],
                     duration_units=note_data["duration_units"],
@@ -43,7 +46,7 @@ class ClipBuilder:
                     expression=note_data.get("expression"),
                     microtiming_offset=note_data.get("microtiming_offset"),
                     metadata=note_data.get("metadata"),
-                )
-                await self.note_repo.create_note(note_model)
+                ))
+        await self.note_repo.bulk_create_notes(note_models)
 
         return clip_id
@@ -219,13 +219,12 @@ async def get_clips_by_tag(
     tag: str,
     service: ClipService = Depends(get_clip_service),
 ) -> List[Dict[str, Any]]:
-    """Find clips that have bars whose metadata contains the given tag.
+    """Find clips tagged with the given tag.
 
-    Uses `ClipService.find_clips_by_tag` and returns serialized Pydantic models.
+    Uses `ClipService.find_clips_by_tags` and returns clips with bars and notes.
     """
 
-    clips = await service.find_clips_by_tag(tag)
-    return [c.model_dump() for c in clips]
+    return await service.find_clips_by_tags([tag])
 
 
 @router.post("/compositions")
@@ -311,18 +311,20 @@ class OSCFacade:
         """
         clips = []
         
-        # Search by tags
-        if request.tags:
-            clips.extend(await self.clip_service.find_clips_by_tags(request.tags))
-        
-        # Search by name pattern
-        if request.name_pattern:
-            name_clips = await self.clip_service.find_clips_by_name(request.name_pattern)
-            # Get full clip data with bars and notes
-            for clip_dict in name_clips:
-                full_clip = await self.clip_service.get_clip_with_bars_and_notes(clip_dict["id"])
-                if full_clip:
-                    clips.append(full_clip)
+        # Run every lookup in one session instead of one per call
+        async with self.clip_service.db.session_unit() as session:
+            # Search by tags
+            if request.tags:
+                clips.extend(await self.clip_service.find_clips_by_tags(request.tags, session=session))
+            
+            # Search by name pattern
+            if request.name_pattern:
+                name_clips = await self.clip_service.find_clips_by_name(request.name_pattern, session=session)
+                # Get full clip data with bars and notes in one batch
+                clips.extend(await self.clip_service.bulk_get_clips_with_bars_and_notes(
+                    [clip_dict["id"] for clip_dict in name_clips],
+                    session=session
+                ))
         
         # Convert to DSL format
         dsl_clips = []
@@ -374,12 +376,9 @@ class OSCFacade:
             for bar in track.get("bars", []):
                 clip_ids.add(bar["clip_id"])
         
-        # Load all clips
-        clips = []
-        for clip_id in clip_ids:
-            clip = await self.clip_service.get_clip_with_bars_and_notes(clip_id)
-            if clip:
-                clips.append(clip)
+        # Load all clips with one query per level (clips, bars, notes), ordered
+        # by ID; missing clips are skipped
+        clips = await self.clip_service.bulk_get_clips_with_bars_and_notes(sorted(clip_ids))
         
         # Build DSL project structure
         project = {
@@ -20,7 +20,7 @@ from src.controller.osc_facade import (  # type: ignore
     NLToSMLRequest,
     PlaybackConfig,
 )
-from src.repository import get_database, reset_database  # type: ignore
+from src.repository import get_database, reset_database, areset_database  # type: ignore
 from src.core.schema import metadata  # type: ignore
 from src.services import ClipService  # type: ignore
 
@@ -31,7 +31,7 @@ from src.services import ClipService  # type: ignore
 
 async def init_test_facade():
     """Initialize an in-memory SQLite DB and OSCFacade wired to it."""
-    reset_database()
+    await areset_database()
     db = get_database("sqlite:///:memory:", echo=False)
     await db.create_tables(metadata)
     facade = OSCFacade()
@@ -232,7 +232,7 @@ async def test_search_clips_by_tags_and_name():
 async def test_dsl_to_midi_file_produces_bytes(tmp_path: Path):
     """dsl_to_midi_file should return non-empty MIDI bytes and optionally write a file."""
     # Use SQLite-backed DB to avoid any Postgres driver requirements
-    reset_database()
+    await areset_database()
     get_database("sqlite:///:memory:", echo=False)
     facade = OSCFacade()
 
@@ -1,11 +1,18 @@
 # schema.py
 from sqlalchemy import (
     Table, Column, Integer, String, Float, Boolean,
-    JSON, ForeignKey, MetaData, Index
+    JSON, ForeignKey, MetaData, Index, DDL, event
 )
 
 metadata = MetaData()
 
+# Trigram indexes (for ILIKE '%pattern%' name searches) need pg_trgm on PostgreSQL
+event.listen(
+    metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
 # ---------------------------------------------------------
 # 3.3 CLIPS TABLE (Spec §3.3)
 # ---------------------------------------------------------
@@ -17,6 +24,13 @@ clips = Table(
     Column("name", String(255), nullable=False),
     Column("track_name", String(255), nullable=True),
     Column("tags", JSON, nullable=True),
+    
+    # Makes search_by_name's ILIKE '%pattern%' indexable on PostgreSQL
+    Index(
+        "idx_clips_name_trgm", "name",
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    ).ddl_if(dialect="postgresql"),
 )
 
 # ---------------------------------------------------------
@@ -38,7 +52,8 @@ clip_bars = Table(
     Column("pedal_events", JSON, nullable=True),
     Column("metadata", JSON, nullable=True),
     
-    Index("idx_clip_bars_clip_id", "clip_id"),
+    # Serves WHERE clip_id = ? ORDER BY bar_index with an ordered index scan
+    Index("idx_clip_bars_clip_id_bar_index", "clip_id", "bar_index"),
 )
 
 # ---------------------------------------------------------
@@ -69,7 +84,8 @@ notes = Table(
     # Expression (note-level CC, pitch bend, etc.)
     Column("expression", JSON, nullable=True),
     
-    Index("idx_notes_clip_bar_id", "clip_bar_id"),
+    # Serves WHERE clip_bar_id = ? ORDER BY start_beat with an ordered index scan
+    Index("idx_notes_clip_bar_id_start_beat", "clip_bar_id", "start_beat"),
 )
 
 # ---------------------------------------------------------
@@ -83,6 +99,14 @@ compositions = Table(
     Column("name", String(255), nullable=False),
     Column("ticks_per_quarter", Integer, nullable=False, default=480),
     Column("tempo_bpm", Integer, nullable=False, default=120),
+    
+    Index("idx_compositions_tempo_bpm", "tempo_bpm"),
+    # Makes search_by_name's ILIKE '%pattern%' indexable on PostgreSQL
+    Index(
+        "idx_compositions_name_trgm", "name",
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    ).ddl_if(dialect="postgresql"),
 )
 
 # ---------------------------------------------------------
@@ -112,5 +136,6 @@ track_bars = Table(
     Column("clip_id", Integer, ForeignKey("clips.id", ondelete="CASCADE"), nullable=False),
     Column("clip_bar_index", Integer, nullable=False),
     
-    Index("idx_track_bars_track_id", "track_id"),
+    # Serves WHERE track_id = ? ORDER BY bar_index with an ordered index scan
+    Index("idx_track_bars_track_id_bar_index", "track_id", "bar_index"),
 )
@@ -1,7 +1,8 @@
 # src/repository/__init__.py
 
-from .database import Database, get_database, reset_database, db
+from .database import Database, get_database, reset_database, areset_database, db
 from .base_repository import BaseRepository
+from .batch_loader import BatchLoader
 from .clip_repository import ClipRepository
 from .clip_bar_repository import ClipBarRepository
 from .note_repository import NoteRepository
@@ -14,9 +15,11 @@ __all__ = [
     "Database",
     "get_database",
     "reset_database",
+    "areset_database",
     "db",
     # Base
     "BaseRepository",
+    "BatchLoader",
     # Repositories
     "ClipRepository",
     "ClipBarRepository",
@@ -1,11 +1,107 @@
 # base_repository.py
 # Async base repository class with common CRUD operations
 
-from typing import List, Dict, Any, Optional
-from sqlalchemy import Table, select, insert, update, delete
+import json
+from itertools import groupby
+from operator import itemgetter
+from typing import List, Dict, Any, Optional, Sequence, Union, AsyncIterator
+from sqlalchemy import (
+    Table, Row, RowMapping, JSON, select, insert, update, delete, func, bindparam, literal_column
+)
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
+# Rows fetched per server-side cursor round-trip when streaming results
+STREAM_CHUNK_SIZE = 1000
+
+# Row count above which bulk_insert switches to COPY on asyncpg
+COPY_THRESHOLD = 5000
+
+# jsonb_agg over zero rows yields NULL; trees use an empty array instead
+EMPTY_JSONB_ARRAY = literal_column("'[]'::jsonb")
+
+
+def group_sorted(rows: Sequence[Any], key: str) -> Dict[Any, List[Any]]:
+    """
+    Group rows that are already ordered by a key into lists.
+    
+    A sort-based groupby: no per-row hashing or list growth in a dict of
+    buckets. The rows must come from a query ordered by the key (ORDER BY key,
+    ...), otherwise later runs of a key replace earlier ones.
+    
+    Args:
+        rows: Row mappings/dicts ordered by key
+        key: Column name to group on
+    
+    Returns:
+        Dict of key value -> list of rows, in row order
+    """
+    return {value: list(group) for value, group in groupby(rows, key=itemgetter(key))}
+
+
+def row_dict(row: Any) -> Dict[str, Any]:
+    """
+    Copy a row mapping into a mutable dictionary with plain str keys.
+    
+    SQLAlchemy labels result columns with quoted_name (a str subclass), which
+    strict serializers such as orjson reject as dict keys; plain keys also
+    match the trees decoded from jsonb on PostgreSQL.
+    
+    Args:
+        row: Row mapping (or dict) to copy
+    
+    Returns:
+        Dictionary of column name -> value
+    """
+    return {str(key): value for key, value in row.items()}
+
+
+def jsonb_row(table: Table, **children):
+    """
+    Build a PostgreSQL jsonb_build_object() of every column of a table.
+    
+    Args:
+        table: SQLAlchemy Table whose columns become the object's keys
+        **children: Extra keys mapped to nested JSON expressions
+                    (e.g. bars=jsonb_children(...))
+    
+    Returns:
+        SQL expression of type JSONB
+    """
+    args = []
+    for column in table.columns:
+        args.extend((literal_column(f"'{column.name}'"), column))
+    for key, child in children.items():
+        args.extend((literal_column(f"'{key}'"), child))
+    return func.jsonb_build_object(*args, type_=JSONB)
+
+
+def jsonb_children(table: Table, where, order_by, **children):
+    """
+    Build a correlated subquery that aggregates child rows into a jsonb array.
+    
+    Args:
+        table: Child table
+        where: Condition tying child rows to the enclosing parent row
+               (e.g. tracks.c.composition_id == compositions.c.id)
+        order_by: Child column giving the array order
+        **children: Nested child arrays passed on to jsonb_row
+    
+    Returns:
+        Scalar subquery of type JSONB (an empty array when there are no children)
+    """
+    return (
+        select(func.coalesce(
+            func.jsonb_agg(aggregate_order_by(jsonb_row(table, **children), order_by)),
+            EMPTY_JSONB_ARRAY,
+            type_=JSONB
+        ))
+        .where(where)
+        .scalar_subquery()
+    )
+
+
 class BaseRepository:
     """
     Base repository providing common CRUD operations for a single table.
@@ -20,6 +116,14 @@ class BaseRepository:
             table: SQLAlchemy Table object
         """
         self.table = table
+        self._columns = {c.name: c for c in table.columns}
+        self._get_by_id_stmt = select(table).where(table.c.id == bindparam("id"))
+        
+        # INSERT constructs are built once and executed with parameter dicts,
+        # so SQLAlchemy's compiled cache (and asyncpg's prepared statement
+        # cache) is hit on every call instead of compiling per-row .values()
+        self._insert_stmt = insert(table)
+        self._insert_returning_stmt = insert(table).returning(table.c.id, sort_by_parameter_order=True)
     
     async def insert(self, session: AsyncSession, data: Dict[str, Any]) -> int:
         """
@@ -32,9 +136,7 @@ class BaseRepository:
         Returns:
             ID of inserted row
         """
-        result = await session.execute(
-            insert(self.table).values(**data)
-        )
+        result = await session.execute(self._insert_stmt, data)
         return result.inserted_primary_key[0]
     
     async def insert_many(self, session: AsyncSession, data_list: List[Dict[str, Any]]) -> List[int]:
@@ -46,20 +148,96 @@ class BaseRepository:
             data_list: List of dictionaries with column names to values
         
         Returns:
-            List of IDs of inserted rows
+            List of IDs of inserted rows, in the same order as data_list
+        
+        Consecutive rows that share the same set of columns are sent as a single
+        batched INSERT ... RETURNING (SQLAlchemy "insertmanyvalues"), so a
+        homogeneous data_list costs one round-trip per batch instead of one
+        per row. An AsyncSession cannot run statements concurrently, so
+        batching is how inserts are pipelined within the caller's transaction.
         """
         if not data_list:
             return []
         
         ids = []
-        for data in data_list:
-            result = await session.execute(
-                insert(self.table).values(**data)
-            )
-            ids.append(result.inserted_primary_key[0])
+        for _, rows in groupby(data_list, key=frozenset):
+            result = await session.execute(self._insert_returning_stmt, list(rows))
+            ids.extend(result.scalars().all())
         return ids
     
-    async def get_by_id(self, session: AsyncSession, id: int) -> Optional[Dict[str, Any]]:
+    async def bulk_insert(self, session: AsyncSession, data_list: List[Dict[str, Any]]) -> int:
+        """
+        Insert many rows without returning their IDs.
+        
+        Use this for large imports where the caller does not need the generated
+        IDs. On asyncpg, more than COPY_THRESHOLD rows are loaded with
+        COPY FROM STDIN; otherwise each run of rows sharing a column set goes
+        out as one executemany INSERT. Callers that need IDs should use insert_many instead.
+        
+        Args:
+            session: SQLAlchemy async session
+            data_list: List of dictionaries with column names to values
+        
+        Returns:
+            Number of rows inserted
+        """
+        if not data_list:
+            return 0
+        
+        connection = await session.connection()
+        if connection.dialect.driver == "asyncpg" and len(data_list) > COPY_THRESHOLD:
+            await self._copy_records(connection, data_list)
+        else:
+            for _, rows in groupby(data_list, key=frozenset):
+                await session.execute(self._insert_stmt, list(rows))
+        return len(data_list)
+    
+    async def _copy_records(self, connection, data_list: List[Dict[str, Any]]) -> None:
+        """
+        Load rows with asyncpg's COPY support on the session's own connection,
+        inside the session's transaction.
+        
+        Autoincrement primary keys are left to the database; missing values
+        fall back to the column's scalar default.
+        
+        Args:
+            connection: SQLAlchemy AsyncConnection bound to an asyncpg driver
+            data_list: List of dictionaries with column names to values
+        """
+        columns = [
+            c for c in self.table.columns
+            if not (c.primary_key and c.autoincrement)
+        ]
+        defaults = {
+            c.name: c.default.arg if c.default is not None and c.default.is_scalar else None
+            for c in columns
+        }
+        json_columns = {c.name for c in columns if isinstance(c.type, JSON)}
+        
+        def encode(name, value):
+            if name in json_columns and value is not None:
+                return json.dumps(value)
+            return value
+        
+        records = [
+            tuple(encode(c.name, data.get(c.name, defaults[c.name])) for c in columns)
+            for data in data_list
+        ]
+        
+        # The asyncpg adapter only sends BEGIN when a statement executes
+        # through it; COPY goes to the driver directly, so as the session's
+        # first statement it would autocommit. Run a trivial statement first
+        # so the COPY joins the session's transaction.
+        await connection.execute(select(literal_column("1")))
+        
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            self.table.name,
+            records=records,
+            columns=[c.name for c in columns],
+        )
+    
+    async def get_by_id(self, session: AsyncSession, id: int) -> Optional[RowMapping]:
         """
         Get a single row by ID.
         
@@ -68,31 +246,54 @@ class BaseRepository:
             id: Primary key value
         
         Returns:
-            Dictionary of column names to values, or None if not found
+            Read-only mapping of column names to values, or None if not found
+            (callers that need to mutate the row should copy it with dict())
+        """
+        result = await session.execute(self._get_by_id_stmt, {"id": id})
+        return result.mappings().first()
+    
+    async def get_by_ids(self, session: AsyncSession, ids: Sequence[int]) -> Sequence[RowMapping]:
         """
-        stmt = select(self.table).where(self.table.c.id == id)
+        Get many rows by ID in a single IN-query.
+        
+        Args:
+            session: SQLAlchemy async session
+            ids: Primary key values
+        
+        Returns:
+            List of read-only row mappings, ordered by ID
+        """
+        if not ids:
+            return []
+        
+        stmt = select(self.table).where(self.table.c.id.in_(ids)).order_by(self.table.c.id)
         result = await session.execute(stmt)
-        row = result.first()
-        return dict(row._mapping) if row else None
+        return result.mappings().all()
     
-    async def get_all(self, session: AsyncSession, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    async def get_all(
+        self, 
+        session: AsyncSession, 
+        limit: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> Sequence[Union[RowMapping, Row]]:
         """
         Get all rows from the table.
         
         Args:
             session: SQLAlchemy async session
             limit: Optional limit on number of rows
+            columns: Optional column names to project; rows are then returned
+                     as lightweight named tuples instead of mappings
         
         Returns:
-            List of dictionaries with column names to values
+            List of read-only row mappings of column names to values
+            (or named tuples when columns is given)
         """
-        stmt = select(self.table)
+        stmt = self._select(columns)
         if limit:
             stmt = stmt.limit(limit)
         
-        result = await session.execute(stmt)
-        results = result.fetchall()
-        return [dict(row._mapping) for row in results]
+        return [row async for row in self._stream(session, stmt, as_tuples=columns is not None)]
     
     async def update_by_id(self, session: AsyncSession, id: int, data: Dict[str, Any]) -> bool:
         """
@@ -129,30 +330,123 @@ class BaseRepository:
         )
         return result.rowcount > 0
     
-    async def find_by(self, session: AsyncSession, **filters) -> List[Dict[str, Any]]:
+    async def find_by(
+        self, 
+        session: AsyncSession, 
+        *, 
+        columns: Optional[Sequence[str]] = None, 
+        **filters
+    ) -> Sequence[Union[RowMapping, Row]]:
         """
         Find rows matching the given filters.
         
         Args:
             session: SQLAlchemy async session
+            columns: Optional column names to project; rows are then returned
+                     as lightweight named tuples instead of mappings
             **filters: Column names and values to filter by
         
         Returns:
-            List of dictionaries with column names to values
+            List of read-only row mappings of column names to values
+            (or named tuples when columns is given)
         
         Example:
             await repo.find_by(session, name="test", style="latin")
+            await repo.find_by(session, columns=("id", "pitch"), clip_bar_id=1)
+        """
+        return [row async for row in self.iter_by(session, columns=columns, **filters)]
+    
+    async def iter_by(
+        self, 
+        session: AsyncSession, 
+        *, 
+        columns: Optional[Sequence[str]] = None, 
+        **filters
+    ) -> AsyncIterator[Union[RowMapping, Row]]:
+        """
+        Stream rows matching the given filters without materializing the full result.
+        
+        Rows are fetched through a server-side cursor in chunks of
+        STREAM_CHUNK_SIZE, so peak memory is bounded by the chunk rather
+        than the size of the result set.
+        
+        Args:
+            session: SQLAlchemy async session
+            columns: Optional column names to project; rows are then yielded
+                     as lightweight named tuples instead of mappings
+            **filters: Column names and values to filter by
+        
+        Yields:
+            Read-only row mappings of column names to values
+            (or named tuples when columns is given)
+        
+        Example:
+            async for note in repo.iter_by(session, clip_bar_id=1):
+                ...
         """
-        stmt = select(self.table)
+        stmt = self._select(columns)
         
         for column_name, value in filters.items():
-            if hasattr(self.table.c, column_name):
-                column = getattr(self.table.c, column_name)
+            column = self._columns.get(column_name)
+            if column is not None:
                 stmt = stmt.where(column == value)
         
+        async for row in self._stream(session, stmt, as_tuples=columns is not None):
+            yield row
+    
+    def _select(self, columns: Optional[Sequence[str]] = None):
+        """
+        Build a SELECT over the whole table, or over the named columns only.
+        
+        Args:
+            columns: Optional column names to project
+        
+        Returns:
+            SQLAlchemy Select
+        
+        Raises:
+            ValueError: If a column name is not part of the table
+        """
+        if columns is None:
+            return select(self.table)
+        
+        unknown = [name for name in columns if name not in self._columns]
+        if unknown:
+            raise ValueError(f"Unknown columns for table {self.table.name}: {unknown}")
+        return select(*(self._columns[name] for name in columns))
+    
+    async def _stream(
+        self, 
+        session: AsyncSession, 
+        stmt, 
+        as_tuples: bool = False
+    ) -> AsyncIterator[Union[RowMapping, Row]]:
+        """
+        Execute a statement through a server-side cursor and yield its rows.
+        
+        Args:
+            session: SQLAlchemy async session
+            stmt: Selectable to execute
+            as_tuples: If True, yield named-tuple Rows instead of row mappings
+        
+        Yields:
+            Read-only row mappings of column names to values, or Rows
+        """
+        result = await session.stream(stmt.execution_options(yield_per=STREAM_CHUNK_SIZE))
+        rows = result if as_tuples else result.mappings()
+        async for row in rows:
+            yield row
+    
+    async def _fetch(self, session: AsyncSession, stmt) -> List[Dict[str, Any]]:
+        """Execute a statement and return its rows as mutable dictionaries (plain str keys, see row_dict)."""
         result = await session.execute(stmt)
-        results = result.fetchall()
-        return [dict(row._mapping) for row in results]
+        keys = [str(key) for key in result.keys()]
+        return [dict(zip(keys, row)) for row in result]
+    
+    async def _dialect_name(self, session: AsyncSession) -> str:
+        """Name of the database dialect the session is bound to (e.g. "postgresql")."""
+        connection = await session.connection()
+        return connection.dialect.name
     
     async def count(self, session: AsyncSession, **filters) -> int:
         """
@@ -165,13 +459,11 @@ class BaseRepository:
         Returns:
             Number of matching rows
         """
-        from sqlalchemy import func
-        
         stmt = select(func.count()).select_from(self.table)
         
         for column_name, value in filters.items():
-            if hasattr(self.table.c, column_name):
-                column = getattr(self.table.c, column_name)
+            column = self._columns.get(column_name)
+            if column is not None:
                 stmt = stmt.where(column == value)
         
         result = await session.execute(stmt)
@@ -189,8 +481,6 @@ class BaseRepository:
         Returns:
             True if row exists, False otherwise
         """
-        from sqlalchemy import func
-        
         stmt = select(func.count()).select_from(self.table).where(self.table.c.id == id)
         result = await session.execute(stmt)
         count = result.scalar()
@@ -0,0 +1,90 @@
+# batch_loader.py
+# Coalesces concurrent single-key lookups into one batched query
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+
+class BatchLoader:
+    """
+    DataLoader-style request coalescer.
+
+    Every call to load() made within the same event-loop tick is collected and
+    resolved by a single call to batch_fn, so K concurrent lookups cost one
+    query instead of K. Duplicate keys share one slot in the batch.
+
+    Example:
+        loader = BatchLoader(lambda keys: fetch_many(session, keys), default=list)
+        bars_a, bars_b = await asyncio.gather(loader.load(1), loader.load(2))
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]],
+        default: Optional[Callable[[], Any]] = None
+    ):
+        """
+        Initialize the loader.
+
+        Args:
+            batch_fn: Async callable taking a list of keys and returning a dict
+                      of key -> value
+            default: Optional factory for keys missing from batch_fn's result
+                     (None is used if not given)
+        """
+        self._batch_fn = batch_fn
+        self._default = default
+        self._pending: Dict[Hashable, List[asyncio.Future]] = {}
+        self._flush_scheduled = False
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def load(self, key: Hashable) -> Any:
+        """
+        Load the value for a single key, batched with concurrent callers.
+
+        Args:
+            key: Key to load
+
+        Returns:
+            Value for the key from batch_fn (or the default)
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(key, []).append(future)
+
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            # call_soon runs after every callback already queued for this tick,
+            # which is where sibling coroutines issue their own load() calls
+            loop.call_soon(self._start_flush, loop)
+
+        return await future
+
+    def _start_flush(self, loop: asyncio.AbstractEventLoop):
+        """Run the pending batch in a task (kept referenced until done)."""
+        task = loop.create_task(self._flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self):
+        """Resolve every pending future with one call to batch_fn."""
+        pending, self._pending = self._pending, {}
+        self._flush_scheduled = False
+
+        try:
+            results = await self._batch_fn(list(pending))
+        except Exception as exc:
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(exc)
+            return
+
+        for key, futures in pending.items():
+            if key in results:
+                value = results[key]
+            else:
+                value = self._default() if self._default else None
+            for future in futures:
+                if not future.done():
+                    future.set_result(value)
@@ -1,9 +1,9 @@
 # clip_bar_repository.py
 # Async repository for clip_bars table
 
-from typing import List, Dict, Any, Optional
+from typing import Optional, Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, bindparam, RowMapping
 
 from src.core.schema import clip_bars
 from src.repository.base_repository import BaseRepository
@@ -14,8 +14,20 @@ class ClipBarRepository(BaseRepository):
     
     def __init__(self):
         super().__init__(clip_bars)
+        
+        # Statements are built once with bind parameters so the compiled SQL
+        # (and the driver's prepared statement) is reused across calls
+        self._by_clip = (
+            select(self.table)
+            .where(self.table.c.clip_id == bindparam("clip_id"))
+            .order_by(self.table.c.bar_index)
+        )
+        self._by_clip_and_bar = select(self.table).where(
+            (self.table.c.clip_id == bindparam("clip_id")) &
+            (self.table.c.bar_index == bindparam("bar_index"))
+        )
     
-    async def find_by_clip_id(self, session: AsyncSession, clip_id: int) -> List[Dict[str, Any]]:
+    async def find_by_clip_id(self, session: AsyncSession, clip_id: int) -> Sequence[RowMapping]:
         """
         Find all bars for a given clip, ordered by bar_index.
         
@@ -26,21 +38,37 @@ class ClipBarRepository(BaseRepository):
         Returns:
             List of clip bar dictionaries, ordered by bar_index
         """
+        result = await session.execute(self._by_clip, {"clip_id": clip_id})
+        return result.mappings().all()
+    
+    async def find_by_clip_ids(self, session: AsyncSession, clip_ids: Sequence[int]) -> Sequence[RowMapping]:
+        """
+        Find the bars of several clips in one query.
+        
+        Args:
+            session: SQLAlchemy async session
+            clip_ids: IDs of the clips
+        
+        Returns:
+            List of clip bar dictionaries, ordered by clip_id then bar_index
+        """
+        if not clip_ids:
+            return []
+        
         stmt = (
             select(self.table)
-            .where(self.table.c.clip_id == clip_id)
-            .order_by(self.table.c.bar_index)
+            .where(self.table.c.clip_id.in_(clip_ids))
+            .order_by(self.table.c.clip_id, self.table.c.bar_index)
         )
         result = await session.execute(stmt)
-        results = result.fetchall()
-        return [dict(row._mapping) for row in results]
+        return result.mappings().all()
     
     async def get_by_clip_and_bar(
         self, 
         session: AsyncSession, 
         clip_id: int, 
         bar_index: int
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Optional[RowMapping]:
         """
         Get a specific bar from a clip.
         
@@ -50,17 +78,15 @@ class ClipBarRepository(BaseRepository):
             bar_index: Index of the bar within the clip
         
         Returns:
-            Clip bar dictionary, or None if not found
+            Clip bar mapping, or None if not found
         """
-        stmt = select(self.table).where(
-            (self.table.c.clip_id == clip_id) &
-            (self.table.c.bar_index == bar_index)
+        result = await session.execute(
+            self._by_clip_and_bar,
+            {"clip_id": clip_id, "bar_index": bar_index}
         )
-        result = await session.execute(stmt)
-        row = result.first()
-        return dict(row._mapping) if row else None
+        return result.mappings().first()
     
-    async def find_with_expression(self, session: AsyncSession, expression_type: str) -> List[Dict[str, Any]]:
+    async def find_with_expression(self, session: AsyncSession, expression_type: str) -> Sequence[RowMapping]:
         """
         Find clip bars that have a specific type of expression curve.
         
@@ -71,11 +97,9 @@ class ClipBarRepository(BaseRepository):
         Returns:
             List of clip bar dictionaries
         """
-        column = getattr(self.table.c, expression_type, None)
+        column = self._columns.get(expression_type)
         if column is None:
             return []
         
         stmt = select(self.table).where(column.isnot(None))
-        result = await session.execute(stmt)
-        results = result.fetchall()
-        return [dict(row._mapping) for row in results]
+        return [row async for row in self._stream(session, stmt)]
@@ -1,12 +1,32 @@
 # clip_repository.py
 # Async repository for clips table
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, exists, cast, func, bindparam, RowMapping
+from sqlalchemy.dialects.postgresql import JSONB, array
 
-from src.core.schema import clips
-from src.repository.base_repository import BaseRepository
+from src.core.schema import clips, clip_bars, notes
+from src.repository.base_repository import BaseRepository, group_sorted, jsonb_row, jsonb_children, row_dict
+
+
+def clip_bars_jsonb():
+    """
+    Build the jsonb array of a clip's bars (ordered by bar_index), each with
+    its "notes" (ordered by start_beat), correlated to the enclosing clips row.
+    
+    Shared by every statement that embeds clip trees, so the server-side
+    clip shape is defined once.
+    
+    Returns:
+        Scalar subquery expression
+    """
+    return jsonb_children(
+        clip_bars, clip_bars.c.clip_id == clips.c.id, clip_bars.c.bar_index,
+        notes=jsonb_children(
+            notes, notes.c.clip_bar_id == clip_bars.c.id, notes.c.start_beat
+        ),
+    )
 
 
 class ClipRepository(BaseRepository):
@@ -14,8 +34,13 @@ class ClipRepository(BaseRepository):
     
     def __init__(self):
         super().__init__(clips)
+        
+        # Clip -> clip bars -> notes as one nested jsonb document
+        self._tree_stmt = select(
+            jsonb_row(clips, bars=clip_bars_jsonb())
+        ).where(clips.c.id == bindparam("id"))
     
-    async def find_by_name(self, session: AsyncSession, name: str) -> List[Dict[str, Any]]:
+    async def find_by_name(self, session: AsyncSession, name: str) -> Sequence[RowMapping]:
         """
         Find clips by name (exact match).
         
@@ -28,7 +53,7 @@ class ClipRepository(BaseRepository):
         """
         return await self.find_by(session, name=name)
     
-    async def find_by_track_name(self, session: AsyncSession, track_name: str) -> List[Dict[str, Any]]:
+    async def find_by_track_name(self, session: AsyncSession, track_name: str) -> Sequence[RowMapping]:
         """
         Find clips by track name.
         
@@ -41,7 +66,7 @@ class ClipRepository(BaseRepository):
         """
         return await self.find_by(session, track_name=track_name)
     
-    async def search_by_name(self, session: AsyncSession, name_pattern: str) -> List[Dict[str, Any]]:
+    async def search_by_name(self, session: AsyncSession, name_pattern: str) -> Sequence[RowMapping]:
         """
         Search clips by name pattern (case-insensitive).
         
@@ -56,33 +81,97 @@ class ClipRepository(BaseRepository):
             self.table.c.name.ilike(name_pattern)
         )
         result = await session.execute(stmt)
-        results = result.fetchall()
-        return [dict(row._mapping) for row in results]
+        return result.mappings().all()
     
-    async def find_by_tags(self, session: AsyncSession, tags: List[str]) -> List[Dict[str, Any]]:
+    async def find_by_tags(self, session: AsyncSession, tags: List[str]) -> Sequence[RowMapping]:
         """
         Find clips that have any of the specified tags.
         
+        The tag match runs in the database: JSONB ?| on PostgreSQL, and
+        json_each on SQLite.
+        
         Args:
             session: SQLAlchemy async session
             tags: List of tags to search for
         
         Returns:
-            List of clip dictionaries
+            List of clip dictionaries, ordered by ID
         """
-        from sqlalchemy import func, cast, String
+        if not tags:
+            return []
         
-        stmt = select(self.table).where(
-            self.table.c.tags.isnot(None)
-        )
+        if await self._dialect_name(session) == "postgresql":
+            has_tag = cast(self.table.c.tags, JSONB).has_any(array(tags))
+        else:
+            tag_values = func.json_each(self.table.c.tags).table_valued("value")
+            has_tag = exists(select(1).select_from(tag_values).where(tag_values.c.value.in_(tags)))
+        
+        stmt = select(self.table).where(has_tag).order_by(self.table.c.id)
         result = await session.execute(stmt)
-        results = result.fetchall()
+        return result.mappings().all()
+    
+    async def get_tree(self, session: AsyncSession, clip_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Load a clip with its bars and their notes.
+        
+        On PostgreSQL the tree is built server-side with jsonb_build_object /
+        jsonb_agg and returned in a single round-trip. Other databases fall
+        back to load_trees.
+        
+        Args:
+            session: SQLAlchemy async session
+            clip_id: ID of the clip
+        
+        Returns:
+            Clip dictionary with "bars" (ordered by bar_index), each with
+            "notes" (ordered by start_beat), or None if not found
+        """
+        if await self._dialect_name(session) == "postgresql":
+            result = await session.execute(self._tree_stmt, {"id": clip_id})
+            return result.scalar_one_or_none()
+        
+        clip = await self.get_by_id(session, clip_id)
+        if not clip:
+            return None
+        return (await self.load_trees(session, [clip]))[0]
+    
+    async def load_trees(self, session: AsyncSession, clip_rows: Sequence[RowMapping]) -> List[Dict[str, Any]]:
+        """
+        Copy clip rows and attach their bars and notes.
+        
+        Bars and notes are fetched with one IN-list query each, however many
+        clips are given, ordered by parent ID and grouped in a single pass.
+        
+        Args:
+            session: SQLAlchemy async session
+            clip_rows: Clip rows (e.g. from get_by_ids or find_by_tags)
+        
+        Returns:
+            List of clip dictionaries with "bars", each with "notes"
+        """
+        clip_list = [row_dict(clip) for clip in clip_rows]
+        if not clip_list:
+            return clip_list
+        
+        bar_rows = await self._fetch(
+            session,
+            select(clip_bars)
+            .where(clip_bars.c.clip_id.in_([c["id"] for c in clip_list]))
+            .order_by(clip_bars.c.clip_id, clip_bars.c.bar_index)
+        )
+        note_rows = await self._fetch(
+            session,
+            select(notes)
+            .where(notes.c.clip_bar_id.in_([b["id"] for b in bar_rows]))
+            .order_by(notes.c.clip_bar_id, notes.c.start_beat)
+        ) if bar_rows else []
         
-        matching_clips = []
-        for row in results:
-            clip_dict = dict(row._mapping)
-            clip_tags = clip_dict.get("tags", []) or []
-            if any(tag in clip_tags for tag in tags):
-                matching_clips.append(clip_dict)
+        # Both queries are ordered by the parent key, so group by runs
+        notes_by_bar = group_sorted(note_rows, "clip_bar_id")
+        for bar in bar_rows:
+            bar["notes"] = notes_by_bar.get(bar["id"], [])
         
-        return matching_clips
+        bars_by_clip = group_sorted(bar_rows, "clip_id")
+        for clip in clip_list:
+            clip["bars"] = bars_by_clip.get(clip["id"], [])
+        return clip_list
@@ -1,12 +1,13 @@
 # composition_repository.py
 # Async repository for compositions table
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, bindparam, RowMapping
 
-from src.core.schema import compositions
-from src.repository.base_repository import BaseRepository
+from src.core.schema import compositions, tracks, track_bars, clips
+from src.repository.base_repository import BaseRepository, group_sorted, jsonb_row, jsonb_children, row_dict
+from src.repository.clip_repository import ClipRepository, clip_bars_jsonb
 
 
 class CompositionRepository(BaseRepository):
@@ -14,8 +15,49 @@ class CompositionRepository(BaseRepository):
     
     def __init__(self):
         super().__init__(compositions)
+        
+        # Clip trees are loaded by ClipRepository, so there is one
+        # implementation of "clip -> bars -> notes" for every read path
+        self._clip_repo = ClipRepository()
+        
+        # Composition -> tracks -> track bars as one nested jsonb document
+        self._tree_stmt = select(
+            jsonb_row(
+                compositions,
+                tracks=jsonb_children(
+                    tracks, tracks.c.composition_id == compositions.c.id, tracks.c.id,
+                    bars=jsonb_children(
+                        track_bars, track_bars.c.track_id == tracks.c.id, track_bars.c.bar_index
+                    ),
+                ),
+            )
+        ).where(compositions.c.id == bindparam("id"))
+        
+        # Same tree plus every clip the tracks reference (clip -> bars -> notes),
+        # matching the shape of load_full
+        referenced_clip_ids = (
+            select(track_bars.c.clip_id)
+            .join(tracks, track_bars.c.track_id == tracks.c.id)
+            .where(tracks.c.composition_id == compositions.c.id)
+            .correlate(compositions)
+        )
+        self._full_tree_stmt = select(
+            jsonb_row(
+                compositions,
+                tracks=jsonb_children(
+                    tracks, tracks.c.composition_id == compositions.c.id, tracks.c.id,
+                    bars=jsonb_children(
+                        track_bars, track_bars.c.track_id == tracks.c.id, track_bars.c.bar_index
+                    ),
+                ),
+                clips=jsonb_children(
+                    clips, clips.c.id.in_(referenced_clip_ids), clips.c.id,
+                    bars=clip_bars_jsonb(),
+                ),
+            )
+        ).where(compositions.c.id == bindparam("id"))
     
-    async def find_by_name(self, session: AsyncSession, name: str) -> List[Dict[str, Any]]:
+    async def find_by_name(self, session: AsyncSession, name: str) -> Sequence[RowMapping]:
         """
         Find compositions by name (exact match).
         
@@ -28,7 +70,7 @@ class CompositionRepository(BaseRepository):
         """
         return await self.find_by(session, name=name)
     
-    async def search_by_name(self, session: AsyncSession, name_pattern: str) -> List[Dict[str, Any]]:
+    async def search_by_name(self, session: AsyncSession, name_pattern: str) -> Sequence[RowMapping]:
         """
         Search compositions by name pattern (case-insensitive).
         
@@ -43,15 +85,14 @@ class CompositionRepository(BaseRepository):
             self.table.c.name.ilike(name_pattern)
         )
         result = await session.execute(stmt)
-        results = result.fetchall()
-        return [dict(row._mapping) for row in results]
+        return result.mappings().all()
     
     async def find_by_tempo_range(
         self, 
         session: AsyncSession, 
         min_tempo: int, 
         max_tempo: int
-    ) -> List[Dict[str, Any]]:
+    ) -> Sequence[RowMapping]:
         """
         Find compositions within a tempo range.
         
@@ -68,5 +109,103 @@ class CompositionRepository(BaseRepository):
             (self.table.c.tempo_bpm <= max_tempo)
         )
         result = await session.execute(stmt)
-        results = result.fetchall()
-        return [dict(row._mapping) for row in results]
+        return result.mappings().all()
+    
+    async def get_tree(self, session: AsyncSession, composition_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Load a composition with its tracks and their track bars.
+        
+        On PostgreSQL the tree is built server-side with jsonb_build_object /
+        jsonb_agg and returned in a single round-trip. Other databases fall
+        back to one IN-list query per level, stitched in Python.
+        
+        Args:
+            session: SQLAlchemy async session
+            composition_id: ID of the composition
+        
+        Returns:
+            Composition dictionary with "tracks" (each with "bars", ordered by
+            bar_index), or None if not found
+        """
+        if await self._dialect_name(session) == "postgresql":
+            result = await session.execute(self._tree_stmt, {"id": composition_id})
+            return result.scalar_one_or_none()
+        
+        composition = await self.get_by_id(session, composition_id)
+        if not composition:
+            return None
+        
+        track_rows = await self._fetch(
+            session,
+            select(tracks).where(tracks.c.composition_id == composition_id).order_by(tracks.c.id)
+        )
+        track_bar_rows = await self._fetch(
+            session,
+            select(track_bars)
+            .where(track_bars.c.track_id.in_([t["id"] for t in track_rows]))
+            .order_by(track_bars.c.track_id, track_bars.c.bar_index)
+        ) if track_rows else []
+        
+        bars_by_track = group_sorted(track_bar_rows, "track_id")
+        for track in track_rows:
+            track["bars"] = bars_by_track.get(track["id"], [])
+        
+        composition = row_dict(composition)
+        composition["tracks"] = track_rows
+        return composition
+    
+    async def load_full_tree(self, session: AsyncSession, composition_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Load the same tree as load_full in a single statement where possible.
+        
+        On PostgreSQL the whole traversal (composition, tracks, track bars,
+        clips, clip bars, notes) runs server-side as nested jsonb subqueries
+        and comes back in one round-trip. Other databases use load_full.
+        
+        Args:
+            session: SQLAlchemy async session
+            composition_id: ID of the composition
+        
+        Returns:
+            Composition dictionary with "tracks" (each with "bars") and "clips"
+            (ordered by id, each with "bars", each with "notes"), or None if
+            not found
+        """
+        if await self._dialect_name(session) == "postgresql":
+            result = await session.execute(self._full_tree_stmt, {"id": composition_id})
+            return result.scalar_one_or_none()
+        
+        return await self.load_full(session, composition_id)
+    
+    async def load_full(self, session: AsyncSession, composition_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Load a composition with its tracks, track bars and every referenced clip.
+        
+        The composition, tracks and track bars come from get_tree (one
+        round-trip on PostgreSQL, one IN-list query per level elsewhere); the
+        referenced clips, with their bars and notes, are then loaded by
+        ClipRepository.load_trees with one query per level, so the number of
+        round-trips is fixed regardless of how many tracks or bars the
+        composition has.
+        
+        Args:
+            session: SQLAlchemy async session
+            composition_id: ID of the composition
+        
+        Returns:
+            Composition dictionary with "tracks" (each with "bars") and "clips"
+            (ordered by id, each with "bars", each with "notes"), or None if
+            not found
+        """
+        composition = await self.get_tree(session, composition_id)
+        if composition is None:
+            return None
+        
+        # Each referenced clip once; get_by_ids returns the rows ordered by id
+        clip_ids = list(dict.fromkeys(
+            bar["clip_id"] for track in composition["tracks"] for bar in track["bars"]
+        ))
+        
+        clip_rows = await self._clip_repo.get_by_ids(session, clip_ids)
+        composition["clips"] = await self._clip_repo.load_trees(session, clip_rows)
+        return composition
@@ -4,9 +4,10 @@ import asyncio
 
 from pydantic import BaseModel
 from sqlalchemy import MetaData
+from sqlalchemy.pool import StaticPool
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from contextlib import asynccontextmanager
-from typing import Optional, AsyncGenerator
+from typing import Optional, AsyncGenerator, Set
 import os
 from dotenv import load_dotenv
 
@@ -32,6 +33,9 @@ class Database:
                              If None, reads from DATABASE_URL env var.
                              Must use async driver (e.g., postgresql+asyncpg, sqlite+aiosqlite)
             echo: If True, log all SQL statements (useful for debugging)
+        
+        Pool sizing for non-SQLite databases can be tuned with the DB_POOL_SIZE
+        and DB_MAX_OVERFLOW env vars (both default to 2x the CPU count).
         """
         if connection_string is None:
             connection_string = os.getenv(
@@ -54,8 +58,26 @@ class Database:
         
         # Only add pooling params for non-SQLite databases
         if not connection_string.startswith("sqlite"):
-            engine_kwargs["pool_size"] = 10        # Max 10 connections in pool
-            engine_kwargs["max_overflow"] = 20     # Allow 20 additional connections if pool is full
+            default_pool_size = (os.cpu_count() or 4) * 2
+            engine_kwargs["pool_size"] = int(os.getenv("DB_POOL_SIZE", default_pool_size))
+            engine_kwargs["max_overflow"] = int(os.getenv("DB_MAX_OVERFLOW", default_pool_size))
+            engine_kwargs["pool_use_lifo"] = True  # Reuse warm connections; idle ones age out
+            engine_kwargs["pool_recycle"] = 3600   # Recycle connections after an hour
+        else:
+            # A local SQLite file never goes stale, so skip the SELECT 1 per checkout
+            engine_kwargs["pool_pre_ping"] = False
+            if ":memory:" in connection_string:
+                # Every new connection to :memory: is a separate, empty database;
+                # share a single connection so all sessions see the same data
+                engine_kwargs["poolclass"] = StaticPool
+                engine_kwargs["connect_args"] = {"check_same_thread": False}
+        
+        # Keep asyncpg's per-connection prepared statement caches warm
+        if connection_string.startswith("postgresql+asyncpg"):
+            engine_kwargs["connect_args"] = {
+                "prepared_statement_cache_size": 512,
+                "statement_cache_size": 512,
+            }
         
         self.engine: AsyncEngine = create_async_engine(connection_string, **engine_kwargs)
         
@@ -88,6 +110,32 @@ class Database:
                 await session.rollback()
                 raise
     
+    @asynccontextmanager
+    async def session_unit(self, session: Optional[AsyncSession] = None) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Join the caller's unit of work, or start a new one.
+        
+        Lets service methods accept an optional session so orchestrated call
+        chains share one connection and one transaction instead of opening
+        a session per call.
+        
+        Usage:
+            async with db.session_unit(session) as session:
+                ...
+        
+        Args:
+            session: Existing session to reuse; its owner commits or rolls back
+        
+        Yields:
+            The given session, or a new transactional session from session()
+        """
+        if session is not None:
+            yield session
+            return
+        
+        async with self.session() as new_session:
+            yield new_session
+    
     def get_session(self) -> AsyncSession:
         """
         Get a new async session (caller is responsible for closing).
@@ -127,6 +175,9 @@ class Database:
 # Singleton instance - import this in your repositories
 _db_instance: Optional[Database] = None
 
+# Background pool closes scheduled by reset_database (kept referenced until done)
+_pending_closes: Set[asyncio.Task] = set()
+
 
 def get_database(connection_string: Optional[str] = None, echo: bool = False) -> Database:
     """
@@ -145,12 +196,35 @@ def get_database(connection_string: Optional[str] = None, echo: bool = False) ->
     return _db_instance
 
 
-def reset_database():
-    """Reset the singleton database instance (useful for testing)."""
+async def areset_database():
+    """Reset the singleton database instance and close its connection pool (useful for testing)."""
     global _db_instance
     if _db_instance is not None:
-        _db_instance.close()
-        _db_instance = None
+        db_instance, _db_instance = _db_instance, None
+        await db_instance.close()
+
+
+def reset_database():
+    """
+    Reset the singleton database instance from synchronous code.
+    
+    Prefer `await areset_database()` in async code. If an event loop is
+    already running, the pool is closed in a background task on that loop.
+    """
+    global _db_instance
+    if _db_instance is None:
+        return
+    
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        asyncio.run(areset_database())
+        return
+    
+    db_instance, _db_instance = _db_instance, None
+    task = loop.create_task(db_instance.close())
+    _pending_closes.add(task)
+    task.add_done_callback(_pending_closes.discard)
 
 
 # Convenience alias
@@ -1,9 +1,9 @@
 # note_repository.py
 # Async repository for notes table
 
-from typing import List, Dict, Any, Optional
+from typing import Optional, Sequence, Union
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, true, func, Row, RowMapping
 
 from src.core.schema import notes
 from src.repository.base_repository import BaseRepository
@@ -15,27 +15,61 @@ class NoteRepository(BaseRepository):
     def __init__(self):
         super().__init__(notes)
     
-    async def find_by_clip_bar_id(self, session: AsyncSession, clip_bar_id: int) -> List[Dict[str, Any]]:
+    async def find_by_clip_bar_id(
+        self, 
+        session: AsyncSession, 
+        clip_bar_id: int,
+        columns: Optional[Sequence[str]] = None
+    ) -> Sequence[Union[RowMapping, Row]]:
         """
         Find all notes for a given clip bar, ordered by start_beat.
         
         Args:
             session: SQLAlchemy async session
             clip_bar_id: ID of the clip bar
+            columns: Optional column names to project (e.g. ("pitch", "start_beat"));
+                     notes are then returned as lightweight named tuples
         
         Returns:
-            List of note dictionaries, ordered by start_beat
+            List of note dictionaries (or named tuples), ordered by start_beat
         """
         stmt = (
-            select(self.table)
+            self._select(columns)
             .where(self.table.c.clip_bar_id == clip_bar_id)
             .order_by(self.table.c.start_beat)
         )
-        result = await session.execute(stmt)
-        results = result.fetchall()
-        return [dict(row._mapping) for row in results]
+        return [row async for row in self._stream(session, stmt, as_tuples=columns is not None)]
     
-    async def find_rests(self, session: AsyncSession, clip_bar_id: int) -> List[Dict[str, Any]]:
+    async def find_by_clip_bar_ids(
+        self, 
+        session: AsyncSession, 
+        clip_bar_ids: Sequence[int],
+        columns: Optional[Sequence[str]] = None
+    ) -> Sequence[Union[RowMapping, Row]]:
+        """
+        Find the notes of several clip bars in one query.
+        
+        Args:
+            session: SQLAlchemy async session
+            clip_bar_ids: IDs of the clip bars
+            columns: Optional column names to project; notes are then returned
+                     as lightweight named tuples
+        
+        Returns:
+            List of note dictionaries (or named tuples), ordered by clip_bar_id
+            then start_beat
+        """
+        if not clip_bar_ids:
+            return []
+        
+        stmt = (
+            self._select(columns)
+            .where(self.table.c.clip_bar_id.in_(clip_bar_ids))
+            .order_by(self.table.c.clip_bar_id, self.table.c.start_beat)
+        )
+        return [row async for row in self._stream(session, stmt, as_tuples=columns is not None)]
+    
+    async def find_rests(self, session: AsyncSession, clip_bar_id: int) -> Sequence[RowMapping]:
         """
         Find all rest notes in a clip bar.
         
@@ -51,8 +85,7 @@ class NoteRepository(BaseRepository):
             (self.table.c.is_rest == True)
         )
         result = await session.execute(stmt)
-        results = result.fetchall()
-        return [dict(row._mapping) for row in results]
+        return result.mappings().all()
     
     async def find_by_pitch_range(
         self, 
@@ -60,7 +93,7 @@ class NoteRepository(BaseRepository):
         clip_bar_id: int,
         min_pitch: int, 
         max_pitch: int
-    ) -> List[Dict[str, Any]]:
+    ) -> Sequence[RowMapping]:
         """
         Find notes within a pitch range.
         
@@ -80,8 +113,50 @@ class NoteRepository(BaseRepository):
             (self.table.c.is_rest == False)
         )
         result = await session.execute(stmt)
-        results = result.fetchall()
-        return [dict(row._mapping) for row in results]
+        return result.mappings().all()
+    
+    async def find_within_own_pitch_range(
+        self, 
+        session: AsyncSession, 
+        clip_bar_id: int
+    ) -> Sequence[RowMapping]:
+        """
+        Find the notes of a clip bar that lie within the bar's own pitch range.
+        
+        Equivalent to calling get_pitch_range followed by find_by_pitch_range,
+        but done in a single round-trip: the range is computed in a CTE and
+        joined back onto the notes.
+        
+        Args:
+            session: SQLAlchemy async session
+            clip_bar_id: ID of the clip bar
+        
+        Returns:
+            List of note dictionaries, ordered by start_beat
+        """
+        in_bar = (
+            (self.table.c.clip_bar_id == clip_bar_id) &
+            (self.table.c.is_rest == False)
+        )
+        pitch_range = (
+            select(
+                func.min(self.table.c.pitch).label("min_pitch"),
+                func.max(self.table.c.pitch).label("max_pitch")
+            )
+            .where(in_bar)
+            .cte("pitch_range")
+        )
+        stmt = (
+            select(self.table)
+            .join(pitch_range, true())
+            .where(
+                in_bar &
+                self.table.c.pitch.between(pitch_range.c.min_pitch, pitch_range.c.max_pitch)
+            )
+            .order_by(self.table.c.start_beat)
+        )
+        result = await session.execute(stmt)
+        return result.mappings().all()
     
     async def get_pitch_range(self, session: AsyncSession, clip_bar_id: int) -> Optional[tuple[int, int]]:
         """
@@ -94,8 +169,6 @@ class NoteRepository(BaseRepository):
         Returns:
             Tuple of (min_pitch, max_pitch), or None if no notes
         """
-        from sqlalchemy import func
-        
         stmt = select(
             func.min(self.table.c.pitch),
             func.max(self.table.c.pitch)
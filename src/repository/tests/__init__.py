@@ -0,0 +1 @@
+# src/repository/tests/__init__.py
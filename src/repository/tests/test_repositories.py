@@ -0,0 +1,433 @@
+# test_repositories.py
+# Integration tests for the async repositories
+import sys
+from pathlib import Path
+import asyncio
+import gc
+import os
+import weakref
+
+import pytest
+from sqlalchemy import event
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from src.repository import (
+    get_database,
+    areset_database,
+    ClipRepository,
+    ClipBarRepository,
+    NoteRepository,
+    CompositionRepository,
+    TrackRepository,
+    TrackBarRepository,
+)
+from src.repository.base_repository import COPY_THRESHOLD
+from src.core.schema import metadata
+
+
+async def setup_test_db():
+    """Setup a test database in memory."""
+    await areset_database()
+    db = get_database("sqlite:///:memory:", echo=False)
+    await db.create_tables(metadata)
+    return db
+
+
+# PostgreSQL-only paths (jsonb trees, COPY) run against a scratch database
+requires_postgres = pytest.mark.skipif(
+    not os.environ.get("TEST_POSTGRES_URL"),
+    reason="set TEST_POSTGRES_URL to a scratch PostgreSQL database (tables are dropped)"
+)
+
+
+async def setup_postgres_db():
+    """Recreate the tables in the TEST_POSTGRES_URL database."""
+    await areset_database()
+    db = get_database(os.environ["TEST_POSTGRES_URL"], echo=False)
+    await db.drop_tables(metadata)
+    await db.create_tables(metadata)
+    return db
+
+
+async def insert_clip(session, name="test-clip", pitches=(60, 64, 67)):
+    """Insert a one-bar clip with the given note pitches and return (clip_id, clip_bar_id)."""
+    clip_id = await ClipRepository().insert(session, {"name": name, "track_name": "lead"})
+    clip_bar_id = await ClipBarRepository().insert(session, {"clip_id": clip_id, "bar_index": 0})
+    for i, pitch in enumerate(pitches):
+        await NoteRepository().insert(session, {
+            "clip_bar_id": clip_bar_id,
+            "pitch": pitch,
+            "start_beat": float(i),
+            "duration_beats": 1.0,
+            "is_rest": False,
+        })
+    return clip_id, clip_bar_id
+
+
+@pytest.mark.asyncio
+async def test_iter_by_streams_matching_rows():
+    """Test streaming rows with iter_by and the find_by shim."""
+    db = await setup_test_db()
+    note_repo = NoteRepository()
+    
+    async with db.session() as session:
+        _, clip_bar_id = await insert_clip(session)
+        await insert_clip(session, name="other-clip", pitches=(40,))
+        
+        streamed = [note async for note in note_repo.iter_by(session, clip_bar_id=clip_bar_id)]
+        assert [n["pitch"] for n in streamed] == [60, 64, 67]
+        
+        found = await note_repo.find_by(session, clip_bar_id=clip_bar_id)
+        assert found == streamed
+        
+        assert len(await note_repo.get_all(session)) == 4
+        assert len(await note_repo.get_all(session, limit=2)) == 2
+    
+    print("✓ test_iter_by_streams_matching_rows passed")
+
+
+@pytest.mark.asyncio
+async def test_insert_many_returns_ids_in_order():
+    """Test batched insert_many with homogeneous and mixed column sets."""
+    db = await setup_test_db()
+    clip_repo = ClipRepository()
+    
+    async with db.session() as session:
+        rows = [
+            {"name": "a", "track_name": "lead"},
+            {"name": "b", "track_name": "bass"},
+            {"name": "c"},
+            {"name": "d", "track_name": "pad"},
+        ]
+        ids = await clip_repo.insert_many(session, rows)
+        assert len(ids) == 4
+        assert len(set(ids)) == 4
+        
+        for clip_id, row in zip(ids, rows):
+            clip = await clip_repo.get_by_id(session, clip_id)
+            assert clip["name"] == row["name"]
+            assert clip["track_name"] == row.get("track_name")
+        
+        assert await clip_repo.insert_many(session, []) == []
+    
+    print("✓ test_insert_many_returns_ids_in_order passed")
+
+
+@pytest.mark.asyncio
+async def test_find_within_own_pitch_range():
+    """Test the single round-trip pitch range lookup."""
+    db = await setup_test_db()
+    note_repo = NoteRepository()
+    
+    async with db.session() as session:
+        _, clip_bar_id = await insert_clip(session, pitches=(64, 60, 67))
+        await note_repo.insert(session, {
+            "clip_bar_id": clip_bar_id,
+            "pitch": None,
+            "start_beat": 3.0,
+            "duration_beats": 1.0,
+            "is_rest": True,
+        })
+        
+        assert await note_repo.get_pitch_range(session, clip_bar_id) == (60, 67)
+        
+        notes = await note_repo.find_within_own_pitch_range(session, clip_bar_id)
+        assert [n["pitch"] for n in notes] == [64, 60, 67]
+    
+    print("✓ test_find_within_own_pitch_range passed")
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_counts_rows():
+    """Test bulk_insert without returned IDs."""
+    db = await setup_test_db()
+    note_repo = NoteRepository()
+    
+    async with db.session() as session:
+        _, clip_bar_id = await insert_clip(session, pitches=())
+        rows = [
+            {"clip_bar_id": clip_bar_id, "pitch": 60 + i, "start_beat": float(i), "duration_beats": 0.5}
+            for i in range(10)
+        ]
+        assert await note_repo.bulk_insert(session, rows) == 10
+        assert await note_repo.count(session, clip_bar_id=clip_bar_id) == 10
+        assert await note_repo.bulk_insert(session, []) == 0
+    
+    print("✓ test_bulk_insert_counts_rows passed")
+
+
+@pytest.mark.asyncio
+@requires_postgres
+async def test_copy_bulk_insert_rolls_back_on_postgresql():
+    """Test that a COPY as the session's first statement is undone by rollback."""
+    db = await setup_postgres_db()
+    note_repo = NoteRepository()
+    
+    try:
+        async with db.session() as session:
+            _, clip_bar_id = await insert_clip(session, pitches=())
+        
+        rows = [
+            {"clip_bar_id": clip_bar_id, "pitch": 60, "start_beat": i * 0.25, "duration_beats": 0.25}
+            for i in range(COPY_THRESHOLD + 1)
+        ]
+        async with db.get_session() as session:
+            assert await note_repo.bulk_insert(session, rows) == len(rows)
+            await session.rollback()
+        
+        async with db.session() as session:
+            assert len(await note_repo.find_by_clip_bar_id(session, clip_bar_id)) == 0
+    finally:
+        await db.drop_tables(metadata)
+    
+    print("✓ test_copy_bulk_insert_rolls_back_on_postgresql passed")
+
+
+@pytest.mark.asyncio
+async def test_load_full_composition():
+    """Test loading a full composition tree with batched queries."""
+    db = await setup_test_db()
+    composition_repo = CompositionRepository()
+    track_repo = TrackRepository()
+    track_bar_repo = TrackBarRepository()
+    
+    async with db.session() as session:
+        lead_clip_id, _ = await insert_clip(session, name="lead", pitches=(60, 62))
+        bass_clip_id, _ = await insert_clip(session, name="bass", pitches=(36,))
+        
+        composition_id = await composition_repo.insert(session, {"name": "song", "tempo_bpm": 100})
+        lead_id, bass_id = await track_repo.insert_many(session, [
+            {"composition_id": composition_id, "name": "lead"},
+            {"composition_id": composition_id, "name": "bass"},
+        ])
+        await track_bar_repo.insert_many(session, [
+            {"track_id": lead_id, "bar_index": 2, "clip_id": lead_clip_id, "clip_bar_index": 0},
+            {"track_id": lead_id, "bar_index": 1, "clip_id": lead_clip_id, "clip_bar_index": 0},
+            {"track_id": bass_id, "bar_index": 1, "clip_id": bass_clip_id, "clip_bar_index": 0},
+        ])
+        
+        full = await composition_repo.load_full(session, composition_id)
+        assert full["name"] == "song"
+        assert [t["name"] for t in full["tracks"]] == ["lead", "bass"]
+        assert [b["bar_index"] for b in full["tracks"][0]["bars"]] == [1, 2]
+        
+        clips_by_name = {c["name"]: c for c in full["clips"]}
+        assert set(clips_by_name) == {"lead", "bass"}
+        assert [n["pitch"] for n in clips_by_name["lead"]["bars"][0]["notes"]] == [60, 62]
+        assert [n["pitch"] for n in clips_by_name["bass"]["bars"][0]["notes"]] == [36]
+        
+        assert await composition_repo.load_full(session, composition_id + 1) is None
+        
+        tree = await composition_repo.get_tree(session, composition_id)
+        assert [t["bars"] for t in tree["tracks"]] == [t["bars"] for t in full["tracks"]]
+        assert await composition_repo.get_tree(session, composition_id + 1) is None
+        
+        assert await composition_repo.load_full_tree(session, composition_id) == full
+        assert await composition_repo.load_full_tree(session, composition_id + 1) is None
+        
+        clip_tree = await ClipRepository().get_tree(session, lead_clip_id)
+        assert clip_tree == clips_by_name["lead"]
+    
+    print("✓ test_load_full_composition passed")
+
+
+@pytest.mark.asyncio
+@requires_postgres
+async def test_jsonb_trees_match_batched_loads_on_postgresql():
+    """Test that the single-statement jsonb trees equal the batched IN-query loads."""
+    db = await setup_postgres_db()
+    composition_repo = CompositionRepository()
+    
+    try:
+        async with db.session() as session:
+            lead_clip_id, _ = await insert_clip(session, name="lead", pitches=(60, 62))
+            bass_clip_id, _ = await insert_clip(session, name="bass", pitches=(36,))
+            composition_id = await composition_repo.insert(session, {"name": "song"})
+            # The bass track comes first, so clips are first used out of id order
+            bass_id, lead_id = await TrackRepository().insert_many(session, [
+                {"composition_id": composition_id, "name": "bass"},
+                {"composition_id": composition_id, "name": "lead"},
+            ])
+            await TrackBarRepository().insert_many(session, [
+                {"track_id": lead_id, "bar_index": 2, "clip_id": lead_clip_id, "clip_bar_index": 0},
+                {"track_id": lead_id, "bar_index": 1, "clip_id": lead_clip_id, "clip_bar_index": 0},
+                {"track_id": bass_id, "bar_index": 1, "clip_id": bass_clip_id, "clip_bar_index": 0},
+            ])
+        
+        async with db.session() as session:
+            full_tree = await composition_repo.load_full_tree(session, composition_id)
+            # Both loaders list the referenced clips by id
+            assert [c["id"] for c in full_tree["clips"]] == [lead_clip_id, bass_clip_id]
+            assert full_tree == await composition_repo.load_full(session, composition_id)
+            assert await composition_repo.load_full_tree(session, composition_id + 1) is None
+            
+            clip_repo = ClipRepository()
+            assert await clip_repo.get_tree(session, lead_clip_id) == full_tree["clips"][0]
+    finally:
+        await db.drop_tables(metadata)
+    
+    print("✓ test_jsonb_trees_match_batched_loads_on_postgresql passed")
+
+
+@pytest.mark.asyncio
+async def test_bar_lookups_with_bound_statements():
+    """Test the prepared clip bar / track bar lookups."""
+    db = await setup_test_db()
+    clip_bar_repo = ClipBarRepository()
+    track_bar_repo = TrackBarRepository()
+    
+    async with db.session() as session:
+        clip_id, clip_bar_id = await insert_clip(session)
+        await clip_bar_repo.insert(session, {"clip_id": clip_id, "bar_index": 1})
+        
+        clip = await ClipRepository().get_by_id(session, clip_id)
+        assert clip["name"] == "test-clip"
+        assert await ClipRepository().get_by_id(session, clip_id + 100) is None
+        
+        assert (await clip_bar_repo.get_by_clip_and_bar(session, clip_id, 0))["id"] == clip_bar_id
+        assert await clip_bar_repo.get_by_clip_and_bar(session, clip_id, 5) is None
+        assert [b["bar_index"] for b in await clip_bar_repo.find_by_clip_id(session, clip_id)] == [0, 1]
+        
+        composition_id = await CompositionRepository().insert(session, {"name": "song"})
+        track_id = await TrackRepository().insert(session, {"composition_id": composition_id, "name": "lead"})
+        await track_bar_repo.insert_many(session, [
+            {"track_id": track_id, "bar_index": 2, "clip_id": clip_id, "clip_bar_index": 1},
+            {"track_id": track_id, "bar_index": 1, "clip_id": clip_id, "clip_bar_index": 0},
+        ])
+        
+        assert (await track_bar_repo.get_by_track_and_bar(session, track_id, 2))["clip_bar_index"] == 1
+        assert [b["bar_index"] for b in await track_bar_repo.find_by_track_id(session, track_id)] == [1, 2]
+        assert len(await track_bar_repo.find_by_clip_id(session, clip_id)) == 2
+        assert [b["bar_index"] for b in await track_bar_repo.find_by_track_ids(session, [track_id])] == [1, 2]
+        assert await track_bar_repo.find_by_track_ids(session, []) == []
+    
+    print("✓ test_bar_lookups_with_bound_statements passed")
+
+
+@pytest.mark.asyncio
+async def test_column_projection_returns_tuples():
+    """Test projecting a subset of columns into named tuples."""
+    db = await setup_test_db()
+    note_repo = NoteRepository()
+    
+    async with db.session() as session:
+        _, clip_bar_id = await insert_clip(session, pitches=(60, 64))
+        
+        rows = await note_repo.find_by_clip_bar_id(session, clip_bar_id, columns=("pitch", "start_beat"))
+        assert [tuple(r) for r in rows] == [(60, 0.0), (64, 1.0)]
+        assert rows[1].pitch == 64
+        
+        rows = await note_repo.find_by(session, columns=("pitch",), clip_bar_id=clip_bar_id)
+        assert sorted(r.pitch for r in rows) == [60, 64]
+        assert len(await note_repo.get_all(session, columns=("id",))) == 2
+        
+        with pytest.raises(ValueError):
+            await note_repo.get_all(session, columns=("not_a_column",))
+    
+    print("✓ test_column_projection_returns_tuples passed")
+
+
+@pytest.mark.asyncio
+async def test_batched_find_by_clip_id_coalesces_queries():
+    """Test that concurrent batched clip lookups share one IN-query."""
+    db = await setup_test_db()
+    track_bar_repo = TrackBarRepository()
+    
+    async with db.session() as session:
+        clip_a, _ = await insert_clip(session, name="a")
+        clip_b, _ = await insert_clip(session, name="b")
+        clip_c, _ = await insert_clip(session, name="c")
+        composition_id = await CompositionRepository().insert(session, {"name": "song"})
+        track_id = await TrackRepository().insert(session, {"composition_id": composition_id, "name": "lead"})
+        await track_bar_repo.insert_many(session, [
+            {"track_id": track_id, "bar_index": 0, "clip_id": clip_a, "clip_bar_index": 0},
+            {"track_id": track_id, "bar_index": 1, "clip_id": clip_b, "clip_bar_index": 0},
+            {"track_id": track_id, "bar_index": 2, "clip_id": clip_a, "clip_bar_index": 0},
+        ])
+        
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine.sync_engine, "before_cursor_execute", listener)
+        try:
+            bars_a, bars_b, bars_c, bars_a_again = await asyncio.gather(
+                track_bar_repo.find_by_clip_id(session, clip_a, batched=True),
+                track_bar_repo.find_by_clip_id(session, clip_b, batched=True),
+                track_bar_repo.find_by_clip_id(session, clip_c, batched=True),
+                track_bar_repo.find_by_clip_id(session, clip_a, batched=True),
+            )
+        finally:
+            event.remove(db.engine.sync_engine, "before_cursor_execute", listener)
+        
+        assert len(statements) == 1
+        assert sorted(b["bar_index"] for b in bars_a) == [0, 2]
+        assert [b["bar_index"] for b in bars_b] == [1]
+        assert bars_c == []
+        assert bars_a_again == bars_a
+    
+    print("✓ test_batched_find_by_clip_id_coalesces_queries passed")
+
+
+@pytest.mark.asyncio
+async def test_batched_loader_released_with_session():
+    """Test that a session used for batched lookups is not kept alive by the repository."""
+    db = await setup_test_db()
+    track_bar_repo = TrackBarRepository()
+    
+    refs = []
+    for _ in range(5):
+        async with db.session() as session:
+            await track_bar_repo.find_by_clip_id(session, 1, batched=True)
+            refs.append(weakref.ref(session))
+        del session
+    gc.collect()
+    
+    assert [ref() for ref in refs] == [None] * 5
+    
+    print("✓ test_batched_loader_released_with_session passed")
+
+
+async def run_all_tests():
+    """Run all test cases."""
+    print("Running Repository Tests...\n")
+    
+    tests = [
+        test_iter_by_streams_matching_rows,
+        test_insert_many_returns_ids_in_order,
+        test_find_within_own_pitch_range,
+        test_bulk_insert_counts_rows,
+        test_load_full_composition,
+        test_bar_lookups_with_bound_statements,
+        test_column_projection_returns_tuples,
+        test_batched_find_by_clip_id_coalesces_queries,
+        test_batched_loader_released_with_session,
+    ]
+    
+    passed = 0
+    failed = 0
+    
+    for test in tests:
+        try:
+            await test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__} failed: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} error: {e}")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+    
+    print(f"\n{'='*50}")
+    print(f"Tests passed: {passed}/{passed + failed}")
+    print(f"Tests failed: {failed}/{passed + failed}")
+    print(f"{'='*50}")
+    
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = asyncio.run(run_all_tests())
+    sys.exit(0 if success else 1)
@@ -1,12 +1,13 @@
 # track_bar_repository.py
 # Async repository for track_bars table
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Optional, Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, bindparam, RowMapping
 
 from src.core.schema import track_bars
-from src.repository.base_repository import BaseRepository
+from src.repository.base_repository import BaseRepository, group_sorted
+from src.repository.batch_loader import BatchLoader
 
 
 class TrackBarRepository(BaseRepository):
@@ -14,8 +15,21 @@ class TrackBarRepository(BaseRepository):
     
     def __init__(self):
         super().__init__(track_bars)
+        
+        # Statements are built once with bind parameters so the compiled SQL
+        # (and the driver's prepared statement) is reused across calls
+        self._by_track = (
+            select(self.table)
+            .where(self.table.c.track_id == bindparam("track_id"))
+            .order_by(self.table.c.bar_index)
+        )
+        self._by_clip = select(self.table).where(self.table.c.clip_id == bindparam("clip_id"))
+        self._by_track_and_bar = select(self.table).where(
+            (self.table.c.track_id == bindparam("track_id")) &
+            (self.table.c.bar_index == bindparam("bar_index"))
+        )
     
-    async def find_by_track_id(self, session: AsyncSession, track_id: int) -> List[Dict[str, Any]]:
+    async def find_by_track_id(self, session: AsyncSession, track_id: int) -> Sequence[RowMapping]:
         """
         Find all bars for a given track, ordered by bar_index.
         
@@ -26,34 +40,100 @@ class TrackBarRepository(BaseRepository):
         Returns:
             List of track bar dictionaries, ordered by bar_index
         """
+        result = await session.execute(self._by_track, {"track_id": track_id})
+        return result.mappings().all()
+    
+    async def find_by_track_ids(self, session: AsyncSession, track_ids: Sequence[int]) -> Sequence[RowMapping]:
+        """
+        Find the bars of several tracks in one query.
+        
+        Args:
+            session: SQLAlchemy async session
+            track_ids: IDs of the tracks
+        
+        Returns:
+            List of track bar dictionaries, ordered by track_id then bar_index
+        """
+        if not track_ids:
+            return []
+        
         stmt = (
             select(self.table)
-            .where(self.table.c.track_id == track_id)
-            .order_by(self.table.c.bar_index)
+            .where(self.table.c.track_id.in_(track_ids))
+            .order_by(self.table.c.track_id, self.table.c.bar_index)
         )
         result = await session.execute(stmt)
-        results = result.fetchall()
-        return [dict(row._mapping) for row in results]
+        return result.mappings().all()
     
-    async def find_by_clip_id(self, session: AsyncSession, clip_id: int) -> List[Dict[str, Any]]:
+    async def find_by_clip_id(
+        self,
+        session: AsyncSession,
+        clip_id: int,
+        batched: bool = False
+    ) -> Sequence[RowMapping]:
         """
         Find all track bars that reference a specific clip.
         
         Args:
             session: SQLAlchemy async session
             clip_id: ID of the clip
+            batched: If True, coalesce with concurrent batched calls on the
+                     same session into a single IN-query
         
         Returns:
             List of track bar dictionaries
         """
-        return await self.find_by(session, clip_id=clip_id)
+        if batched:
+            return await self._clip_loader(session).load(clip_id)
+        
+        result = await session.execute(self._by_clip, {"clip_id": clip_id})
+        return result.mappings().all()
+    
+    async def find_by_clip_ids(self, session: AsyncSession, clip_ids: Sequence[int]) -> Sequence[RowMapping]:
+        """
+        Find track bars for several clips in one query.
+        
+        Args:
+            session: SQLAlchemy async session
+            clip_ids: IDs of the clips
+        
+        Returns:
+            List of track bar dictionaries, ordered by clip_id
+        """
+        if not clip_ids:
+            return []
+        
+        stmt = (
+            select(self.table)
+            .where(self.table.c.clip_id.in_(clip_ids))
+            .order_by(self.table.c.clip_id)
+        )
+        result = await session.execute(stmt)
+        return result.mappings().all()
+    
+    def _clip_loader(self, session: AsyncSession) -> BatchLoader:
+        """
+        Get (or create) the clip_id batch loader bound to a session.
+        
+        The loader lives in session.info, so batched lookups never share a
+        session across unit-of-work boundaries, and the loader (whose batch
+        function refers to the session) is released with the session.
+        """
+        key = (self, "clip_loader")
+        loader = session.info.get(key)
+        if loader is None:
+            async def load_grouped(clip_ids: List[int]) -> Dict[int, List[RowMapping]]:
+                return group_sorted(await self.find_by_clip_ids(session, clip_ids), "clip_id")
+            
+            loader = session.info[key] = BatchLoader(load_grouped, default=list)
+        return loader
     
     async def get_by_track_and_bar(
         self, 
         session: AsyncSession, 
         track_id: int, 
         bar_index: int
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Optional[RowMapping]:
         """
         Get a specific bar from a track.
         
@@ -63,12 +143,10 @@ class TrackBarRepository(BaseRepository):
             bar_index: Index of the bar within the track
         
         Returns:
-            Track bar dictionary, or None if not found
+            Track bar mapping, or None if not found
         """
-        stmt = select(self.table).where(
-            (self.table.c.track_id == track_id) &
-            (self.table.c.bar_index == bar_index)
+        result = await session.execute(
+            self._by_track_and_bar,
+            {"track_id": track_id, "bar_index": bar_index}
         )
-        result = await session.execute(stmt)
-        row = result.first()
-        return dict(row._mapping) if row else None
+        return result.mappings().first()
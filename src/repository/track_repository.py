@@ -1,9 +1,9 @@
 # track_repository.py
 # Async repository for tracks table
 
-from typing import List, Dict, Any, Optional
+from typing import Optional, Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, RowMapping
 
 from src.core.schema import tracks
 from src.repository.base_repository import BaseRepository
@@ -15,7 +15,7 @@ class TrackRepository(BaseRepository):
     def __init__(self):
         super().__init__(tracks)
     
-    async def find_by_composition_id(self, session: AsyncSession, composition_id: int) -> List[Dict[str, Any]]:
+    async def find_by_composition_id(self, session: AsyncSession, composition_id: int) -> Sequence[RowMapping]:
         """
         Find all tracks for a given composition.
         
@@ -33,7 +33,7 @@ class TrackRepository(BaseRepository):
         session: AsyncSession, 
         composition_id: int, 
         name: str
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Optional[RowMapping]:
         """
         Find a track by name within a composition.
         
@@ -43,12 +43,11 @@ class TrackRepository(BaseRepository):
             name: Track name to search for
         
         Returns:
-            Track dictionary, or None if not found
+            Track mapping, or None if not found
         """
         stmt = select(self.table).where(
             (self.table.c.composition_id == composition_id) &
             (self.table.c.name == name)
         )
         result = await session.execute(stmt)
-        row = result.first()
-        return dict(row._mapping) if row else None
+        return result.mappings().first()
@@ -0,0 +1,137 @@
+# cache.py
+# In-process LRU caches for assembled clips and compositions, with write invalidation
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+from weakref import WeakKeyDictionary, WeakSet
+
+
+class LRUCache:
+    """
+    Small least-recently-used cache backed by an OrderedDict.
+
+    Clips are reusable patterns whose content only changes through the
+    services, so assembled clips can be kept in memory and evicted when the
+    services write or delete them (see evict_clip).
+    """
+
+    def __init__(self, maxsize: int = 10_000):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries before the least recently used is dropped
+        """
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a value and mark it as recently used.
+
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+
+        Returns:
+            Cached value, or default
+        """
+        try:
+            self._data.move_to_end(key)
+        except KeyError:
+            return default
+        return self._data[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, dropping the least recently used entry if full.
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Remove a value.
+
+        Args:
+            key: Cache key
+            default: Value returned if the key is not cached
+
+        Returns:
+            Removed value, or default
+        """
+        return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Every live cache holding assembled clips; weakly held so caches die with their owners
+_clip_caches: "WeakSet[LRUCache]" = WeakSet()
+
+
+def register_clip_cache(cache: LRUCache) -> LRUCache:
+    """
+    Subscribe a clip cache to write invalidation.
+
+    Args:
+        cache: Cache keyed by clip_id
+
+    Returns:
+        The same cache, for chaining
+    """
+    _clip_caches.add(cache)
+    return cache
+
+
+def evict_clip(clip_id: int) -> None:
+    """
+    Evict a clip from every registered clip cache.
+
+    Called by ClipService whenever a clip is created or deleted.
+
+    Args:
+        clip_id: ID of the clip that changed
+    """
+    for cache in list(_clip_caches):
+        cache.pop(clip_id)
+
+
+# Read caches per Database instance, so separate databases never share entries
+_database_caches: "WeakKeyDictionary[Any, Dict[str, LRUCache]]" = WeakKeyDictionary()
+
+
+def cache_for(database: Any, name: str, maxsize: int = 1_000) -> LRUCache:
+    """
+    Get (or create) a named read cache bound to a database.
+
+    Every service instance on the same Database shares the cache, so a
+    write through one instance is visible to reads through another.
+
+    Args:
+        database: Database instance the cached rows come from
+        name: Cache name (e.g. "clips", "compositions")
+        maxsize: Maximum number of entries if the cache is created
+
+    Returns:
+        LRUCache for this database and name
+    """
+    caches = _database_caches.setdefault(database, {})
+    cache = caches.get(name)
+    if cache is None:
+        cache = caches[name] = LRUCache(maxsize=maxsize)
+    return cache
+
@@ -1,7 +1,10 @@
 # clip_service.py
 # Async business logic for clip operations
 
-from typing import List, Dict, Any, Optional
+import copy
+from typing import List, Dict, Any, Optional, Sequence
+from sqlalchemy import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.repository import (
     get_database,
     ClipRepository,
@@ -9,6 +12,7 @@ from src.repository import (
     NoteRepository
 )
 from src.core import Clip as ClipModel
+from src.services.cache import cache_for, evict_clip, register_clip_cache
 
 
 class ClipService:
@@ -28,6 +32,10 @@ class ClipService:
         self.clip_repo = ClipRepository()
         self.clip_bar_repo = ClipBarRepository()
         self.note_repo = NoteRepository()
+        
+        # Assembled clip trees shared by every ClipService on this database;
+        # filled on write (write-through) and on read, evicted by evict_clip
+        self._clip_cache = register_clip_cache(cache_for(self.db, "clips"))
     
     async def create_clip_from_dsl(self, dsl_clip: Dict[str, Any]) -> int:
         """
@@ -76,10 +84,10 @@ class ClipService:
             }
             clip_id = await self.clip_repo.insert(session, clip_data)
             
-            # 2. Insert clip bars and notes
-            for bar_data in dsl_clip.get("bars", []):
-                # Insert clip bar with expression curves
-                clip_bar_data = {
+            # 2. Insert all clip bars (with expression curves) in one batch
+            bars = dsl_clip.get("bars", [])
+            bar_rows = [
+                {
                     "clip_id": clip_id,
                     "bar_index": bar_data["bar_index"],
                     "velocity_curve": bar_data.get("velocity_curve"),
@@ -89,11 +97,16 @@ class ClipService:
                     "pedal_events": bar_data.get("pedal_events"),
                     "metadata": bar_data.get("metadata")
                 }
-                clip_bar_id = await self.clip_bar_repo.insert(session, clip_bar_data)
-                
-                # 3. Insert notes for this bar
+                for bar_data in bars
+            ]
+            clip_bar_ids = await self.clip_bar_repo.insert_many(session, bar_rows)
+            
+            # 3. Insert the notes of every bar in one batch, joined to the
+            #    returned clip_bar ids
+            note_rows = []
+            for clip_bar_id, bar_data in zip(clip_bar_ids, bars):
                 for note_data in bar_data.get("notes", []):
-                    note_insert = {
+                    note_rows.append({
                         "clip_bar_id": clip_bar_id,
                         "pitch": note_data.get("absolute_pitch"),
                         "start_beat": note_data.get("start"),
@@ -105,38 +118,55 @@ class ClipService:
                         "articulation": note_data.get("articulation"),
                         "dynamics": note_data.get("dynamics"),
                         "expression": note_data.get("expression")
-                    }
-                    await self.note_repo.insert(session, note_insert)
+                    })
+            await self.note_repo.insert_many(session, note_rows)
             
-            return clip_id
+            # Write-through: read the tree back in the same transaction, so the
+            # cached entry has exactly the shape of a later database read (JSON
+            # keys as strings, Float columns as floats, server defaults filled)
+            clip = await self.clip_repo.get_tree(session, clip_id)
+        
+        evict_clip(clip_id)
+        self._clip_cache.put(clip_id, clip)
+        return clip_id
     
-    async def get_clip_with_bars_and_notes(self, clip_id: int) -> Optional[Dict[str, Any]]:
+    async def get_clip_with_bars_and_notes(
+        self,
+        clip_id: int,
+        session: Optional[AsyncSession] = None
+    ) -> Optional[Dict[str, Any]]:
         """
         Get a complete clip with all its bars and notes.
         
         Args:
             clip_id: ID of the clip
+            session: Optional session to reuse (a new one is opened if None)
         
         Returns:
             Dictionary with clip, bars, and notes, or None if not found
         """
-        async with self.db.session() as session:
-            # Get clip
-            clip = await self.clip_repo.get_by_id(session, clip_id)
-            if not clip:
+        clip = self._clip_cache.get(clip_id)
+        if clip is None:
+            caller_session = session
+            async with self.db.session_unit(session) as session:
+                # One round-trip on PostgreSQL; batched IN-queries elsewhere
+                clip = await self.clip_repo.get_tree(session, clip_id)
+            if clip is None:
                 return None
-            
-            # Get bars
-            bars = await self.clip_bar_repo.find_by_clip_id(session, clip_id)
-            
-            # Get notes for each bar
-            for bar in bars:
-                bar["notes"] = await self.note_repo.find_by_clip_bar_id(session, bar["id"])
-            
-            clip["bars"] = bars
-            return clip
+            if caller_session is not None:
+                # Read inside the caller's transaction, which may still roll
+                # back: not shared through the cache
+                return clip
+            self._clip_cache.put(clip_id, clip)
+        
+        # Callers own the returned tree; the cached copy stays untouched
+        return copy.deepcopy(clip)
     
-    async def find_clips_by_tags(self, tags: List[str]) -> List[Dict[str, Any]]:
+    async def find_clips_by_tags(
+        self,
+        tags: List[str],
+        session: Optional[AsyncSession] = None
+    ) -> List[Dict[str, Any]]:
         """
         Find clips by tags.
         
@@ -144,33 +174,54 @@ class ClipService:
         
         Args:
             tags: List of tags to search for
+            session: Optional session to reuse (a new one is opened if None)
         
         Returns:
             List of clip dictionaries with full bars and notes
         """
-        async with self.db.session() as session:
-            clip_dicts = await self.clip_repo.find_by_tags(session, tags)
-            
-            # Get full clip data with bars and notes
-            full_clips = []
-            for clip_dict in clip_dicts:
-                full_clip = await self.get_clip_with_bars_and_notes(clip_dict["id"])
-                if full_clip:
-                    full_clips.append(full_clip)
-            
-            return full_clips
+        async with self.db.session_unit(session) as session:
+            clip_rows = await self.clip_repo.find_by_tags(session, tags)
+            return await self.clip_repo.load_trees(session, clip_rows)
     
-    async def find_clips_by_name(self, name_pattern: str) -> List[Dict[str, Any]]:
+    async def bulk_get_clips_with_bars_and_notes(
+        self,
+        clip_ids: List[int],
+        session: Optional[AsyncSession] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get several complete clips with all their bars and notes.
+        
+        Loads clips, bars and notes with one query each, however many clips
+        are requested.
+        
+        Args:
+            clip_ids: IDs of the clips
+            session: Optional session to reuse (a new one is opened if None)
+        
+        Returns:
+            List of clip dictionaries with bars and notes, ordered by ID
+            (missing IDs are skipped)
+        """
+        async with self.db.session_unit(session) as session:
+            clip_rows = await self.clip_repo.get_by_ids(session, clip_ids)
+            return await self.clip_repo.load_trees(session, clip_rows)
+    
+    async def find_clips_by_name(
+        self,
+        name_pattern: str,
+        session: Optional[AsyncSession] = None
+    ) -> Sequence[RowMapping]:
         """
         Search clips by name pattern.
         
         Args:
             name_pattern: Pattern to search for (e.g., "%lead%")
+            session: Optional session to reuse (a new one is opened if None)
         
         Returns:
             List of clip dictionaries
         """
-        async with self.db.session() as session:
+        async with self.db.session_unit(session) as session:
             return await self.clip_repo.search_by_name(session, name_pattern)
     
     async def delete_clip(self, clip_id: int) -> bool:
@@ -185,7 +236,13 @@ class ClipService:
         """
         async with self.db.session() as session:
             # Cascade delete will handle bars and notes
-            return await self.clip_repo.delete_by_id(session, clip_id)
+            deleted = await self.clip_repo.delete_by_id(session, clip_id)
+        
+        evict_clip(clip_id)
+        # Deleting a clip cascades to the track bars that reference it, so
+        # cached composition trees may now be stale
+        cache_for(self.db, "compositions").clear()
+        return deleted
     
     def _dict_to_clip_model(self, clip_dict: Dict[str, Any]) -> ClipModel:
         """
@@ -1,7 +1,10 @@
 # composition_service.py
 # Async business logic for composition operations
 
-from typing import List, Dict, Any, Optional
+import copy
+from typing import AsyncIterator, List, Dict, Any, Optional, Sequence
+from sqlalchemy import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.repository import (
     get_database,
     CompositionRepository,
@@ -9,6 +12,7 @@ from src.repository import (
     TrackBarRepository
 )
 from src.core import Composition as CompositionModel
+from src.services.cache import cache_for
 
 
 class CompositionService:
@@ -28,6 +32,10 @@ class CompositionService:
         self.composition_repo = CompositionRepository()
         self.track_repo = TrackRepository()
         self.track_bar_repo = TrackBarRepository()
+        
+        # Composition trees shared by every CompositionService on this database;
+        # filled on write (write-through) and on read, evicted on delete
+        self._composition_cache = cache_for(self.db, "compositions")
     
     async def create_composition_from_dsl(self, dsl_composition: Dict[str, Any]) -> int:
         """
@@ -70,97 +78,132 @@ class CompositionService:
             }
             composition_id = await self.composition_repo.insert(session, comp_data)
             
-            # 2. Insert tracks and track bars
-            for track_data in dsl_composition.get("tracks", []):
-                # Insert track
-                track_insert = {
+            # 2. Insert all tracks in one batch
+            tracks = dsl_composition.get("tracks", [])
+            track_rows = [
+                {
                     "composition_id": composition_id,
                     "name": track_data["name"]
                 }
-                track_id = await self.track_repo.insert(session, track_insert)
-                
-                # 3. Insert track bars
-                for bar_data in track_data.get("bars", []):
-                    track_bar_insert = {
-                        "track_id": track_id,
-                        "bar_index": bar_data["bar_index"],
-                        "clip_id": bar_data["clip_id"],
-                        "clip_bar_index": bar_data["clip_bar_index"]
-                    }
-                    await self.track_bar_repo.insert(session, track_bar_insert)
+                for track_data in tracks
+            ]
+            track_ids = await self.track_repo.insert_many(session, track_rows)
+            
+            # 3. Insert the bars of every track in one batch
+            bar_rows = [
+                {
+                    "track_id": track_id,
+                    "bar_index": bar_data["bar_index"],
+                    "clip_id": bar_data["clip_id"],
+                    "clip_bar_index": bar_data["clip_bar_index"]
+                }
+                for track_id, track_data in zip(track_ids, tracks)
+                for bar_data in track_data.get("bars", [])
+            ]
+            await self.track_bar_repo.insert_many(session, bar_rows)
             
-            return composition_id
+            # Write-through: read the tree back in the same transaction, so the
+            # cached entry has exactly the shape of a later database read
+            composition = await self.composition_repo.get_tree(session, composition_id)
+        
+        self._composition_cache.put(composition_id, composition)
+        return composition_id
     
-    async def get_composition_with_tracks(self, composition_id: int) -> Optional[Dict[str, Any]]:
+    async def get_composition_with_tracks(
+        self,
+        composition_id: int,
+        session: Optional[AsyncSession] = None
+    ) -> Optional[Dict[str, Any]]:
         """
         Get a complete composition with all its tracks and track bars.
         
         Args:
             composition_id: ID of the composition
+            session: Optional session to reuse (a new one is opened if None)
         
         Returns:
             Dictionary with composition, tracks, and track bars, or None if not found
         """
-        async with self.db.session() as session:
-            # Get composition
-            composition = await self.composition_repo.get_by_id(session, composition_id)
-            if not composition:
+        composition = self._composition_cache.get(composition_id)
+        if composition is None:
+            caller_session = session
+            async with self.db.session_unit(session) as session:
+                # One round-trip on PostgreSQL; batched IN-queries elsewhere
+                composition = await self.composition_repo.get_tree(session, composition_id)
+            if composition is None:
                 return None
-            
-            # Get tracks
-            tracks = await self.track_repo.find_by_composition_id(session, composition_id)
-            
-            # Get track bars for each track
-            for track in tracks:
-                track["bars"] = await self.track_bar_repo.find_by_track_id(session, track["id"])
-            
-            composition["tracks"] = tracks
-            return composition
+            if caller_session is not None:
+                # Read inside the caller's transaction, which may still roll
+                # back: not shared through the cache
+                return composition
+            self._composition_cache.put(composition_id, composition)
+        
+        # Callers own the returned tree; the cached copy stays untouched
+        return copy.deepcopy(composition)
     
-    async def find_compositions_by_name(self, name_pattern: str) -> List[Dict[str, Any]]:
+    async def find_compositions_by_name(
+        self,
+        name_pattern: str,
+        session: Optional[AsyncSession] = None
+    ) -> Sequence[RowMapping]:
         """
         Search compositions by name pattern.
         
         Args:
             name_pattern: Pattern to search for (e.g., "%symphony%")
+            session: Optional session to reuse (a new one is opened if None)
         
         Returns:
             List of composition dictionaries
         """
-        async with self.db.session() as session:
+        async with self.db.session_unit(session) as session:
             return await self.composition_repo.search_by_name(session, name_pattern)
     
-    async def find_compositions_by_tempo(self, min_tempo: int, max_tempo: int) -> List[Dict[str, Any]]:
+    async def find_compositions_by_tempo(
+        self,
+        min_tempo: int,
+        max_tempo: int,
+        session: Optional[AsyncSession] = None
+    ) -> Sequence[RowMapping]:
         """
         Find compositions within a tempo range.
         
         Args:
             min_tempo: Minimum tempo BPM
             max_tempo: Maximum tempo BPM
+            session: Optional session to reuse (a new one is opened if None)
         
         Returns:
             List of composition dictionaries
         """
-        async with self.db.session() as session:
+        async with self.db.session_unit(session) as session:
             return await self.composition_repo.find_by_tempo_range(session, min_tempo, max_tempo)
     
-    async def get_track_by_name(self, composition_id: int, track_name: str) -> Optional[Dict[str, Any]]:
+    async def get_track_by_name(
+        self,
+        composition_id: int,
+        track_name: str,
+        session: Optional[AsyncSession] = None
+    ) -> Optional[Dict[str, Any]]:
         """
         Get a specific track from a composition by name.
         
         Args:
             composition_id: ID of the composition
             track_name: Name of the track
+            session: Optional session to reuse (a new one is opened if None)
         
         Returns:
             Track dictionary with bars, or None if not found
         """
-        async with self.db.session() as session:
+        async with self.db.session_unit(session) as session:
             track = await self.track_repo.find_by_name(session, composition_id, track_name)
             if not track:
                 return None
+            track = dict(track)
             
-            track["bars"] = await self.track_bar_repo.find_by_track_id(session, track["id"])
+            track_bars = await self.track_bar_repo.find_by_track_id(session, track["id"])
+            track["bars"] = [dict(bar) for bar in track_bars]
             return track
     
     async def delete_composition(self, composition_id: int) -> bool:
@@ -175,17 +218,49 @@ class CompositionService:
         """
         async with self.db.session() as session:
             # Cascade delete will handle tracks and track bars
-            return await self.composition_repo.delete_by_id(session, composition_id)
+            deleted = await self.composition_repo.delete_by_id(session, composition_id)
+        
+        self._composition_cache.pop(composition_id)
+        return deleted
     
-    async def list_all_compositions(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    async def list_all_compositions(
+        self,
+        limit: Optional[int] = None,
+        session: Optional[AsyncSession] = None
+    ) -> Sequence[RowMapping]:
         """
         List all compositions (optionally limited).
         
         Args:
             limit: Optional limit on number of compositions
+            session: Optional session to reuse (a new one is opened if None)
         
         Returns:
             List of composition dictionaries
         """
-        async with self.db.session() as session:
+        async with self.db.session_unit(session) as session:
             return await self.composition_repo.get_all(session, limit=limit)
+    
+    async def iter_all_compositions(
+        self,
+        session: Optional[AsyncSession] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream every composition without materializing the full list.
+        
+        Rows arrive through a server-side cursor, so memory stays bounded on
+        large catalogs and callers can start work after the first chunk.
+        
+        Args:
+            session: Optional session to reuse (a new one is opened if None)
+        
+        Yields:
+            Composition dictionaries
+        
+        Example:
+            async for composition in service.iter_all_compositions():
+                ...
+        """
+        async with self.db.session_unit(session) as session:
+            async for row in self.composition_repo.iter_by(session):
+                yield dict(row)
@@ -1,6 +1,30 @@
-from typing import Any, Dict, List, Optional
+import bisect
+import hashlib
+import json
+import math
+import struct
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
 import mido
+import numpy as np
+
+from src.services.cache import LRUCache
+
+try:
+    # Optional: faster serialization of the export cache key
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Microseconds per quarter note for the usual integer tempos, so set_tempo
+# does not go through mido.bpm2tempo for every export
+TEMPO_TABLE: Dict[int, int] = {bpm: mido.bpm2tempo(bpm) for bpm in range(20, 301)}
+
+# Exported MIDI bytes by content digest of the composition dict, so an
+# unchanged composition (e.g. re-exported on every edit or play) is not rebuilt
+_export_cache = LRUCache(maxsize=32)
 
 
 def composition_db_dict_to_midi_bytes(data: Dict[str, Any], include_all_tracks: bool = True) -> bytes:
@@ -43,8 +67,40 @@ def composition_db_dict_to_midi_bytes(data: Dict[str, Any], include_all_tracks:
         }
       ]
     }
+
+    The first MIDI track is a conductor track holding the tempo and time
+    signature; one track per logical track follows.
+
+    Results are cached by content: exporting an equal dict again returns the
+    cached bytes.
     """
 
+    try:
+        key = _content_digest(data)
+    except TypeError:
+        # Not JSON-serializable (e.g. raw database types): export uncached
+        return _export(data)
+
+    midi_bytes = _export_cache.get(key)
+    if midi_bytes is None:
+        midi_bytes = _export(data)
+        _export_cache.put(key, midi_bytes)
+    return midi_bytes
+
+
+def _content_digest(data: Dict[str, Any]) -> bytes:
+    """Digest of a composition dict's content (key order does not matter)."""
+
+    if orjson is not None:
+        serialized = orjson.dumps(data, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    else:
+        serialized = json.dumps(data, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.blake2b(serialized, digest_size=16).digest()
+
+
+def _export(data: Dict[str, Any]) -> bytes:
+    """Build the MIDI file bytes for composition_db_dict_to_midi_bytes."""
+
     comp_meta = data["composition"]
     clips = data.get("clips", [])
     tracks = data.get("tracks", [])
@@ -55,36 +111,51 @@ def composition_db_dict_to_midi_bytes(data: Dict[str, Any], include_all_tracks:
     # Map clips by id for quick lookup
     clips_by_id: Dict[int, Dict[str, Any]] = {c["id"]: c for c in clips}
 
-    mid = mido.MidiFile(ticks_per_beat=ticks_per_beat)
+    # The file is written directly as Standard MIDI File chunks (the same
+    # bytes mido.MidiFile.save produces): a type-1 MThd header, a conductor
+    # track, then one MTrk chunk per track
+    chunks = [_chunk(b"MThd", struct.pack(">hhh", 1, len(tracks) + 1, ticks_per_beat))]
 
     # For now assume 4/4 (4 beats per bar) consistently.
     beats_per_bar = 4.0
 
-    # Create one MIDI track per logical track
-    for track_index, track_data in enumerate(tracks):
-        track = mido.MidiTrack()
-        mid.tracks.append(track)
+    # Conductor track: tempo and time signature at tick 0, no channel events
+    tempo = TEMPO_TABLE.get(tempo_bpm) or mido.bpm2tempo(tempo_bpm)
+    chunks.append(_chunk(
+        b"MTrk",
+        _meta_event(0x51, tempo.to_bytes(3, "big"))
+        + _meta_event(0x58, bytes([4, 2, 24, 8]))  # 4/4, 24 clocks per click, 8 32nds per quarter
+        + END_OF_TRACK,
+    ))
 
-        # Set track name
-        track.append(mido.MetaMessage("track_name", name=track_data.get("name", f"Track {track_index+1}"), time=0))
+    # Notes of each referenced clip bar as a NOTE_DTYPE array, built once per
+    # clip bar (a bar can be referenced by many tracks and bar indices)
+    bar_notes: Dict[int, np.ndarray] = {}
 
-        # Only set tempo on the first track
-        if track_index == 0:
-            tempo = mido.bpm2tempo(tempo_bpm)
-            track.append(mido.MetaMessage("set_tempo", tempo=tempo, time=0))
+    # Lookups used for every bar reference, bound once
+    get_clip = clips_by_id.get
+    get_bar_notes = bar_notes.get
 
-        # Collect absolute-time events in ticks
-        events: List[tuple[int, mido.Message]] = []
+    # Create one MIDI track per logical track
+    for track_index, track_data in enumerate(tracks):
+        # Set track name
+        track_name = track_data.get("name", f"Track {track_index+1}")
+        track_bytes = bytearray(_meta_event(0x03, track_name.encode("latin-1")))
 
         # Assign MIDI channel per track (0-15)
         channel = track_index % 16
 
+        # Resolve the track's bar references first, so the number of sounding
+        # notes is known and the track's notes go into one preallocated buffer
+        placed: List[Tuple[float, np.ndarray]] = []
+        count = 0
+
         for bar_ref in track_data.get("bars", []):
             bar_index = int(bar_ref["bar_index"])  # 1-based
             clip_id = int(bar_ref["clip_id"])
             clip_bar_index = int(bar_ref["clip_bar_index"])  # 0-based index into clip.bars
 
-            clip = clips_by_id.get(clip_id)
+            clip = get_clip(clip_id)
             if not clip:
                 continue
 
@@ -95,68 +166,278 @@ def composition_db_dict_to_midi_bytes(data: Dict[str, Any], include_all_tracks:
             bar = clip_bars[clip_bar_index]
             bar_start_beats = (bar_index - 1) * beats_per_bar
 
-            velocity_curve = bar.get("velocity_curve")
+            notes = get_bar_notes(id(bar))
+            if notes is None:
+                notes = bar_notes[id(bar)] = _notes_to_soa(bar, ticks_per_beat)
+
+            if len(notes):
+                placed.append((bar_start_beats, notes))
+                count += len(notes)
+
+        # Copy each bar's notes into its slice of the track buffer, moving
+        # start beats from bar-relative to absolute
+        track_notes = np.empty(count, dtype=NOTE_DTYPE)
+        offset = 0
+        for bar_start_beats, notes in placed:
+            end = offset + len(notes)
+            track_notes[offset:end] = notes
+            track_notes["start"][offset:end] += bar_start_beats
+            offset = end
+
+        # Beats -> ticks for every note at once; np.rint rounds half to even,
+        # like round()
+        note_column = track_notes["pitch"]
+        velocity_column = track_notes["velocity"]
+        note_start_beats = track_notes["start"]
+        note_end_beats = note_start_beats + track_notes["duration"]
+
+        # Absolute-time events as parallel arrays, note-on/note-off interleaved
+        # per note (no per-event appends): ticks, then the status, note and
+        # velocity bytes as uint8, ready to copy into the encoded track
+        ticks = np.empty(2 * count, dtype=np.int64)
+        ticks[0::2] = np.rint(note_start_beats * ticks_per_beat)
+        ticks[1::2] = np.rint(note_end_beats * ticks_per_beat)
+        _check_data_bytes(note_column, velocity_column)
+        event_notes = np.repeat(note_column.astype(np.uint8), 2)
+        event_velocities = np.zeros(2 * count, dtype=np.uint8)
+        event_velocities[0::2] = velocity_column
+        event_status = np.tile(np.array([NOTE_ON | channel, NOTE_OFF | channel], dtype=np.uint8), count)
+
+        # Stable sort by absolute tick (ties keep note order, on before off),
+        # then convert to delta times
+        order = np.argsort(ticks, kind="stable")
+        deltas = np.maximum(np.diff(ticks[order], prepend=0), 0)
+
+        # Encode the sorted events (every field was range-checked above),
+        # then close the track
+        track_bytes += _encode_channel_events(
+            deltas, event_status[order], event_notes[order], event_velocities[order]
+        )
+        track_bytes += END_OF_TRACK
+        chunks.append(_chunk(b"MTrk", track_bytes))
+
+    return b"".join(chunks)
+
+
+# Channel voice status bytes (high nibble; the low nibble is the channel)
+NOTE_OFF = 0x80
+NOTE_ON = 0x90
+
+# Delta time 0, meta event end_of_track
+END_OF_TRACK = b"\x00\xff\x2f\x00"
+
+
+def _chunk(name: bytes, data: bytes) -> bytes:
+    """Frame data as an SMF chunk: 4-byte name, 32-bit big-endian length, data."""
+
+    return name + struct.pack(">L", len(data)) + data
+
+
+def _encode_vlq(value: int) -> bytes:
+    """Encode a non-negative int as a MIDI variable-length quantity."""
+
+    out = [value & 0x7F]
+    value >>= 7
+    while value:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    return bytes(reversed(out))
+
+
+def _meta_event(type_byte: int, data: bytes) -> bytes:
+    """Encode a meta event at delta time 0."""
 
-            for note in bar.get("notes", []):
-                if note.get("is_rest", False):
-                    continue
+    return b"\x00\xff" + bytes([type_byte]) + _encode_vlq(len(data)) + data
 
-                pitch = int(note.get("absolute_pitch", 0))
-                start_beats = float(note.get("start", 0.0))
-                duration_beats = float(note.get("duration", 1.0))
 
-                note_start_beats = bar_start_beats + start_beats
-                note_end_beats = note_start_beats + duration_beats
+def _encode_channel_events(
+    deltas: np.ndarray, statuses: np.ndarray, data1: np.ndarray, data2: np.ndarray
+) -> bytes:
+    """Encode three-byte channel events with VLQ delta times into one buffer.
+
+    The status byte is omitted when it repeats the previous event's (running
+    status), as mido does. The caller's preceding meta events reset running
+    status, so the first event always carries it.
+    """
+
+    count = len(deltas)
+    if not count:
+        return b""
+
+    # VLQ length of every delta (a MIDI delta fits in at most 5 groups of 7 bits)
+    vlq_lengths = np.ones(count, dtype=np.int64)
+    for shift in (7, 14, 21, 28):
+        vlq_lengths += deltas >= (1 << shift)
+
+    with_status = np.ones(count, dtype=bool)
+    with_status[1:] = statuses[1:] != statuses[:-1]
+
+    sizes = vlq_lengths + with_status + 2
+    starts = np.cumsum(sizes) - sizes
+    out = np.empty(int(sizes.sum()), dtype=np.uint8)
+
+    # Delta times, most significant group first; every group but the last has bit 7 set
+    for group in range(int(vlq_lengths.max())):
+        has_group = vlq_lengths > group
+        remaining = vlq_lengths[has_group] - 1 - group
+        value = (deltas[has_group] >> (7 * remaining)) & 0x7F
+        out[starts[has_group] + group] = value | np.where(remaining > 0, 0x80, 0)
+
+    position = starts + vlq_lengths
+    out[position[with_status]] = statuses[with_status]
+    position += with_status
+    out[position] = data1
+    out[position + 1] = data2
+    return out.tobytes()
+
+
+# One sounding note of a clip bar, as a row of a structured array
+NOTE_DTYPE = np.dtype([
+    ("pitch", np.int64),
+    ("start", np.float64),      # beats, relative to bar
+    ("duration", np.float64),   # beats
+    ("velocity", np.int64),
+])
 
-                # Very simple velocity handling: interpolate from bar-level velocity curve if present
-                velocity = _interpolate_curve(velocity_curve, start_beats) if velocity_curve else 100
-                if velocity is None:
-                    velocity = 100
 
-                start_ticks = int(round(note_start_beats * ticks_per_beat))
-                end_ticks = int(round(note_end_beats * ticks_per_beat))
+def _notes_to_soa(bar: Dict[str, Any], ticks_per_beat: int) -> np.ndarray:
+    """Convert a clip bar's sounding note dicts to a NOTE_DTYPE array.
 
-                on = mido.Message("note_on", note=pitch, velocity=velocity, channel=channel, time=0)
-                off = mido.Message("note_off", note=pitch, velocity=0, channel=channel, time=0)
+    Rests and notes without a positive duration are pruned here, so the
+    export never sees them: a zero-length note is silent, and a negative one
+    would sort its note_off before its note_on and hang.
 
-                events.append((start_ticks, on))
-                events.append((end_ticks, off))
+    Very simple velocity handling: interpolate from bar-level velocity curve
+    if present (100 otherwise). The curve is prepared once, and notes sharing
+    a start beat (downbeats, offbeats) reuse the result.
+    """
+
+    curve_key = _curve_key(bar.get("velocity_curve"))
+    velocity_curve = _curve_arrays(curve_key, ticks_per_beat) if curve_key else None
+    velocity_by_start: Dict[float, int] = {}
+
+    # Hot loop: getters and constants are bound to locals once per bar
+    rows: List[Tuple[int, float, float, int]] = []
+    append = rows.append
+    cached_velocity = velocity_by_start.get
+
+    for note in bar.get("notes", []):
+        get = note.get
+        if get("is_rest", False):
+            continue
+
+        duration_beats = float(get("duration", 1.0))
+        if not duration_beats > 0:
+            continue
 
-        # Sort events by absolute tick and convert to delta times
-        events.sort(key=lambda item: item[0])
-        last_tick = 0
-        for abs_tick, msg in events:
-            delta = abs_tick - last_tick
-            msg.time = max(0, delta)
-            track.append(msg)
-            last_tick = abs_tick
+        start_beats = float(get("start", 0.0))
 
-    # Serialize to bytes
-    from io import BytesIO
+        if velocity_curve is None:
+            velocity = 100
+        else:
+            velocity = cached_velocity(start_beats)
+            if velocity is None:
+                times, values, index = velocity_curve
+                velocity = velocity_by_start[start_beats] = _interpolate_points(
+                    times, values, start_beats, index
+                )
 
-    buf = BytesIO()
-    mid.save(file=buf)
-    return buf.getvalue()
+        append((int(get("absolute_pitch", 0)), start_beats, duration_beats, velocity))
+
+    return np.array(rows, dtype=NOTE_DTYPE)
+
+
+def _check_data_bytes(*columns: np.ndarray) -> None:
+    """Validate MIDI data bytes for a whole track at once, as mido.Message would per message."""
+
+    for column in columns:
+        if column.size and (column.min() < 0 or column.max() > 127):
+            raise ValueError("data byte must be in range 0..127")
 
 
 def _interpolate_curve(curve: List[Dict[str, Any]], target_time: float) -> Optional[int]:
     """Linear interpolation helper matching MidiClipPlayer semantics for velocity curves."""
 
+    curve_key = _curve_key(curve)
+    if curve_key is None:
+        return None
+    times, values, _ = _curve_arrays(curve_key)
+    return _interpolate_points(times, values, target_time)
+
+
+def _curve_key(curve: Optional[List[Dict[str, Any]]]) -> Optional[Tuple[Tuple[Any, Any], ...]]:
+    """Hashable (time, value) points of a curve, or None if it is empty."""
+
     if not curve:
         return None
+    return tuple((p["time"], p["value"]) for p in curve)
+
+
+@lru_cache(maxsize=1024)
+def _curve_arrays(
+    curve_key: Tuple[Tuple[Any, Any], ...], ticks_per_beat: Optional[int] = None
+) -> Tuple[List[float], List[float], Optional[Tuple[int, int, List[int]]]]:
+    """Split a curve into parallel time and value lists, plus its _curve_index when
+    ticks_per_beat is given.
+
+    Cached by the curve's points, so curves repeated across bars, clips and
+    exports are prepared once. The returned lists are shared and must not be
+    mutated.
+    """
+
+    times = [float(t) for t, _ in curve_key]
+    values = [float(v) for _, v in curve_key]
+    index = _curve_index(times, ticks_per_beat) if ticks_per_beat else None
+    return times, values, index
+
+
+# Curves spanning more ticks than this are looked up with bisect instead of an index table
+MAX_CURVE_INDEX_TICKS = 1 << 16
 
-    times = [float(p["time"]) for p in curve]
-    values = [float(p["value"]) for p in curve]
+
+def _curve_index(times: List[float], ticks_per_beat: int) -> Optional[Tuple[int, int, List[int]]]:
+    """Map every tick between a curve's first and last point to its segment.
+
+    Returns (ticks_per_beat, first_tick, segments) where segments[k] is the
+    index of the last curve point at or before tick first_tick + k, or None
+    if the curve is too wide to index.
+    """
+
+    first_tick = math.floor(times[0] * ticks_per_beat)
+    last_tick = math.ceil(times[-1] * ticks_per_beat)
+    if last_tick - first_tick > MAX_CURVE_INDEX_TICKS:
+        return None
+
+    grid = np.arange(first_tick, last_tick + 1) / ticks_per_beat
+    segments = np.searchsorted(np.asarray(times), grid, side="right") - 1
+    return ticks_per_beat, first_tick, segments.tolist()
+
+
+def _interpolate_points(
+    times: List[float],
+    values: List[float],
+    target_time: float,
+    index: Optional[Tuple[int, int, List[int]]] = None,
+) -> int:
+    """Interpolate a curve already split by _curve_arrays, optionally using its _curve_index."""
 
     if target_time <= times[0]:
         return int(values[0])
     if target_time >= times[-1]:
         return int(values[-1])
 
-    # Find rightmost value less than or equal to target_time
-    import bisect
-
-    idx = bisect.bisect_right(times, target_time)
+    if index is None:
+        # Find rightmost value less than or equal to target_time
+        idx = bisect.bisect_right(times, target_time)
+    else:
+        ticks_per_beat, first_tick, segments = index
+        seg = segments[math.floor(target_time * ticks_per_beat) - first_tick]
+        # Points can fall between ticks; step to the exact segment (rarely moves)
+        while times[seg + 1] <= target_time:
+            seg += 1
+        while times[seg] > target_time:
+            seg -= 1
+        idx = seg + 1
     t0, t1 = times[idx - 1], times[idx]
     v0, v1 = values[idx - 1], values[idx]
 
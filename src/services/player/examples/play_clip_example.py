@@ -1,5 +1,5 @@
 import fluidsynth
-import json
+import orjson
 import os
 from time import sleep
 
@@ -22,7 +22,7 @@ if __name__ == "__main__":
       }]
     }
     """
-    clip_data = json.loads(clip_json)
+    clip_data = orjson.loads(clip_json)
 
     # Play the clip
     play_clip(clip_data, sf2_path="/Users/chrislomeli/Source/__DATA__/FluidR3_GM.sf2", bpm=120, loop=False)
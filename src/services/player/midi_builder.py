@@ -1,6 +1,77 @@
 import time
 import bisect
+from itertools import groupby
 import mido
+import numpy as np
+
+try:
+    # Optional: compiles the curve-sampling kernel to native code
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Pitch-bend / aftertouch samples per note, at fractions i / CURVE_STEPS of its duration
+CURVE_STEPS = 10
+_STEP_FRACTIONS = np.arange(CURVE_STEPS) / CURVE_STEPS
+
+
+def _sample_curve_loop(times, values, t_beats):
+    """
+    Interpolate a curve at every sample time in t_beats (notes x steps).
+
+    Plain loops over NumPy arrays, so Numba can compile it; same arithmetic
+    as MidiClipPlayer._interp_arrays.
+    """
+    out = np.empty(t_beats.shape, dtype=np.int64)
+    last = times.shape[0] - 1
+    for j in range(t_beats.shape[0]):
+        for i in range(t_beats.shape[1]):
+            t = t_beats[j, i]
+            if t <= times[0]:
+                v = values[0]
+            elif t >= times[last]:
+                v = values[last]
+            else:
+                k = np.searchsorted(times, t, side="right")
+                t0, t1 = times[k - 1], times[k]
+                v0, v1 = values[k - 1], values[k]
+                v = v0 + (v1 - v0) * ((t - t0) / (t1 - t0))
+            out[j, i] = int(v)
+    return out
+
+
+def _sample_curve_numpy(times, values, t_beats):
+    """Vectorized equivalent of _sample_curve_loop, used when Numba is not installed."""
+    idx = np.clip(np.searchsorted(times, t_beats, side="right"), 1, len(times) - 1)
+    t0, t1 = times[idx - 1], times[idx]
+    v0, v1 = values[idx - 1], values[idx]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inner = v0 + (v1 - v0) * ((t_beats - t0) / (t1 - t0))
+    out = np.where(t_beats <= times[0], values[0], np.where(t_beats >= times[-1], values[-1], inner))
+    return out.astype(np.int64)
+
+
+# Playback sleeps until this close to an event, then spins to the exact deadline
+SPIN_NS = 500_000
+
+
+def _sleep_until(deadline_ns):
+    """Wait for an absolute time.monotonic_ns() deadline: coarse sleep, then spin."""
+    remaining = deadline_ns - time.monotonic_ns()
+    if remaining > SPIN_NS:
+        time.sleep((remaining - SPIN_NS) / 1e9)
+    while time.monotonic_ns() < deadline_ns:
+        pass
+
+
+def _event_ms(event):
+    """Batch key for playback: the event time rounded to the millisecond."""
+    return round(event[0] * 1000)
+
+
+# np.interp is not used: its slope-first formula can round differently
+# from _interp_arrays and flip the int() truncation
+_sample_curve = njit(cache=True)(_sample_curve_loop) if njit is not None else _sample_curve_numpy
 
 
 class MidiClipPlayer:
@@ -21,12 +92,23 @@ class MidiClipPlayer:
         self.beat_duration = 60.0 / bpm
         self.beats_per_bar = beats_per_bar
         self.loop = loop
+        self._dispatch = self._build_dispatch()
 
     def _interpolate_curve(self, curve, target_time):
+        points = self._extract(curve)
+        if points is None:
+            return None
+        return self._interp_arrays(*points, target_time)
+
+    @staticmethod
+    def _extract(curve):
+        """Split a curve into (times, values) once, or None if it is empty."""
         if not curve:
             return None
-        times = [p['time'] for p in curve]
-        values = [p['value'] for p in curve]
+        return [p['time'] for p in curve], [p['value'] for p in curve]
+
+    @staticmethod
+    def _interp_arrays(times, values, target_time):
         if target_time <= times[0]:
             return values[0]
         if target_time >= times[-1]:
@@ -37,6 +119,14 @@ class MidiClipPlayer:
         ratio = (target_time - t0) / (t1 - t0)
         return int(v0 + (v1 - v0) * ratio)
 
+    @staticmethod
+    def _sample(points, t_beats):
+        """Sample a curve split by _extract at t_beats; returns nested lists of ints."""
+        times, values = points
+        return _sample_curve(
+            np.asarray(times, dtype=np.float64), np.asarray(values, dtype=np.float64), t_beats
+        ).tolist()
+
     def _schedule_events(self, clip):
         events = []
 
@@ -49,9 +139,11 @@ class MidiClipPlayer:
                     cc_time = bar_start_time + cc_event["time"] * self.beat_duration
                     events.append((cc_time, 'cc', cc_event["controller"], cc_event["value"]))
 
-            # Pitch bend and aftertouch curves
-            pb_curve = bar.get("pitch_bend_curve")
-            at_curve = bar.get("aftertouch_curve")
+            # Velocity, pitch bend and aftertouch curves, split once per bar
+            vc_points = self._extract(bar.get("velocity_curve"))
+            pb_points = self._extract(bar.get("pitch_bend_curve"))
+            at_points = self._extract(bar.get("aftertouch_curve"))
+            interp = self._interp_arrays
 
             # Pedal
             if bar.get("pedal_events"):
@@ -59,82 +151,100 @@ class MidiClipPlayer:
                     ped_time = bar_start_time + ped["time"] * self.beat_duration
                     events.append((ped_time, 'cc', ped["controller"], ped["value"]))
 
-            # Notes
-            for note in bar.get("notes", []):
-                if note.get("is_rest", False):
-                    continue
+            sounding = [note for note in bar.get("notes", []) if not note.get("is_rest", False)]
+
+            # Pitch-bend / aftertouch sample times of every note in the bar
+            # (one row per note), interpolated in one vectorized pass per curve
+            if sounding and (pb_points or at_points):
+                starts = np.array([note["start_beat"] for note in sounding], dtype=np.float64)
+                durations = np.array([note["duration_beats"] for note in sounding], dtype=np.float64)
+                t_beats = starts[:, None] + _STEP_FRACTIONS * durations[:, None]
+                t_secs = (bar_start_time + t_beats * self.beat_duration).tolist()
+                pb_rows = self._sample(pb_points, t_beats) if pb_points else None
+                at_rows = self._sample(at_points, t_beats) if at_points else None
+
+            # Notes; velocity is interpolated once per distinct start beat in the bar
+            velocity_by_start = {}
+            for row, note in enumerate(sounding):
                 pitch = note["pitch"]
                 start_time = bar_start_time + note["start_beat"] * self.beat_duration
                 duration = note["duration_beats"] * self.beat_duration
 
                 # velocity
-                velocity = self._interpolate_curve(bar.get("velocity_curve"), note["start_beat"])
+                velocity = velocity_by_start.get(note["start_beat"])
                 if velocity is None:
-                    velocity = 100
+                    velocity = interp(*vc_points, note["start_beat"]) if vc_points else 100
+                    velocity_by_start[note["start_beat"]] = velocity
 
                 events.append((start_time, 'note_on', pitch, velocity))
                 events.append((start_time + duration, 'note_off', pitch, 0))
 
                 # Pitch bend during note
-                if pb_curve:
-                    steps = 10
-                    for i in range(steps):
-                        t_beat = note["start_beat"] + (i / steps) * note["duration_beats"]
-                        pb_value = self._interpolate_curve(pb_curve, t_beat)
-                        if pb_value is not None:
-                            t_sec = bar_start_time + t_beat * self.beat_duration
-                            events.append((t_sec, 'pitch_bend', None, pb_value))
+                if pb_points:
+                    for t_sec, pb_value in zip(t_secs[row], pb_rows[row]):
+                        events.append((t_sec, 'pitch_bend', None, pb_value))
 
                 # Aftertouch
-                if at_curve:
-                    steps = 10
-                    for i in range(steps):
-                        t_beat = note["start_beat"] + (i / steps) * note["duration_beats"]
-                        at_value = self._interpolate_curve(at_curve, t_beat)
-                        if at_value is not None:
-                            t_sec = bar_start_time + t_beat * self.beat_duration
-                            events.append((t_sec, 'aftertouch', pitch, at_value))
-
-        events.sort(key=lambda x: x[0])
-        return events
+                if at_points:
+                    for t_sec, at_value in zip(t_secs[row], at_rows[row]):
+                        events.append((t_sec, 'aftertouch', pitch, at_value))
 
-    def _send_message(self, kind, param1, param2):
+        # Stable sort on the event times in C, then reorder the tuples once
+        times = np.fromiter((event[0] for event in events), dtype=np.float64, count=len(events))
+        order = np.argsort(times, kind="stable")
+        return [events[i] for i in order.tolist()]
+
+    def _build_dispatch(self):
+        """Map each event kind to a sender for the active backend (built once)."""
         if self.out_port:
-            if kind == 'note_on':
-                msg = mido.Message('note_on', note=param1, velocity=param2)
-            elif kind == 'note_off':
-                msg = mido.Message('note_off', note=param1, velocity=param2)
-            elif kind == 'cc':
-                msg = mido.Message('control_change', control=param1, value=param2)
-            elif kind == 'pitch_bend':
-                msg = mido.Message('pitchwheel', pitch=param2)
-            elif kind == 'aftertouch':
-                msg = mido.Message('aftertouch', value=param2)
-            else:
-                return
-            self.out_port.send(msg)
-        elif self.fs:
-            if kind == 'note_on':
-                self.fs.noteon(0, param1, param2)
-            elif kind == 'note_off':
-                self.fs.noteoff(0, param1)
-            elif kind == 'cc':
-                self.fs.cc(0, param1, param2)
-            elif kind == 'pitch_bend':
+            send = self.out_port.send
+            Message = mido.Message
+            return {
+                'note_on': lambda p1, p2: send(Message('note_on', note=p1, velocity=p2)),
+                'note_off': lambda p1, p2: send(Message('note_off', note=p1, velocity=p2)),
+                'cc': lambda p1, p2: send(Message('control_change', control=p1, value=p2)),
+                'pitch_bend': lambda p1, p2: send(Message('pitchwheel', pitch=p2)),
+                'aftertouch': lambda p1, p2: send(Message('aftertouch', value=p2)),
+            }
+        if self.fs:
+            fs = self.fs
+            return {
+                'note_on': lambda p1, p2: fs.noteon(0, p1, p2),
+                'note_off': lambda p1, p2: fs.noteoff(0, p1),
+                'cc': lambda p1, p2: fs.cc(0, p1, p2),
                 # pyFluidSynth pitch bend uses 14-bit value -8192..8191
-                self.fs.pitch_bend(0, param2 - 8192)
-            elif kind == 'aftertouch':
-                self.fs.channel_pressure(0, param2)
+                'pitch_bend': lambda p1, p2: fs.pitch_bend(0, p2 - 8192),
+                'aftertouch': lambda p1, p2: fs.channel_pressure(0, p2),
+            }
+        return {}
+
+    def _send_message(self, kind, param1, param2):
+        handler = self._dispatch.get(kind)
+        if handler is not None:
+            handler(param1, param2)
 
     def play_dsl_clip(self, clip):
+        # The clip does not change during playback, so it is scheduled (and
+        # batched: events within the same millisecond, e.g. chords and
+        # simultaneous CCs, share one wait) once and replayed on every loop
+        events = self._schedule_events(clip)
+        batches = [(event_ms, list(batch)) for event_ms, batch in groupby(events, key=_event_ms)]
+        if not batches:
+            return
+
+        # Deadlines are absolute offsets from one monotonic start, so sleep
+        # overshoot never accumulates and wall-clock jumps don't matter.
+        # Event kinds without a handler are ignored, as in _send_message
+        get_handler = self._dispatch.get
+        start_ns = time.monotonic_ns()
         while True:
-            events = self._schedule_events(clip)
-            start_time = time.time()
-            for event_time, kind, param1, param2 in events:
-                now = time.time()
-                delay = (start_time + event_time) - now
-                if delay > 0:
-                    time.sleep(delay)
-                self._send_message(kind, param1, param2)
+            for event_ms, batch in batches:
+                _sleep_until(start_ns + event_ms * 1_000_000)
+                for _, kind, param1, param2 in batch:
+                    handler = get_handler(kind)
+                    if handler is not None:
+                        handler(param1, param2)
             if not self.loop:
                 break
+            # The next repetition starts where this one's last event fell
+            start_ns += batches[-1][0] * 1_000_000
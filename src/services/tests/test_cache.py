@@ -0,0 +1,77 @@
+# test_cache.py
+# Unit tests for the in-process clip caches
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from src.services.cache import LRUCache, register_clip_cache, evict_clip
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """Test that the oldest untouched entry is dropped when full."""
+    cache = LRUCache(maxsize=2)
+    cache.put(1, "a")
+    cache.put(2, "b")
+    assert cache.get(1) == "a"  # 1 is now the most recently used
+    cache.put(3, "c")
+    
+    assert 2 not in cache
+    assert cache.get(1) == "a"
+    assert cache.get(3) == "c"
+    assert cache.get(2, "missing") == "missing"
+    assert len(cache) == 2
+    
+    print("✓ test_lru_cache_evicts_least_recently_used passed")
+
+
+def test_evict_clip_reaches_registered_caches():
+    """Test that clip writes evict the clip from every registered cache."""
+    first = register_clip_cache(LRUCache())
+    second = register_clip_cache(LRUCache())
+    unregistered = LRUCache()
+    for cache in (first, second, unregistered):
+        cache.put(7, "clip-7")
+        cache.put(8, "clip-8")
+    
+    evict_clip(7)
+    
+    assert 7 not in first and 7 not in second
+    assert 8 in first and 8 in second
+    assert 7 in unregistered
+    
+    print("✓ test_evict_clip_reaches_registered_caches passed")
+
+
+def run_all_tests():
+    """Run all test cases."""
+    print("Running Cache Tests...\n")
+    
+    tests = [
+        test_lru_cache_evicts_least_recently_used,
+        test_evict_clip_reaches_registered_caches,
+    ]
+    
+    passed = 0
+    failed = 0
+    
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__} failed: {e}")
+            failed += 1
+    
+    print(f"\n{'='*50}")
+    print(f"Tests passed: {passed}/{passed + failed}")
+    print(f"Tests failed: {failed}/{passed + failed}")
+    print(f"{'='*50}")
+    
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -1,22 +1,23 @@
 # test_clip_service.py
 # Integration tests for ClipService
-import json
 import sys
 from pathlib import Path
 import asyncio
 
+import orjson
 import pytest
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
 from src.services import ClipService
-from src.repository import get_database, reset_database
+from src.repository import get_database, areset_database, ClipRepository
 from src.core.schema import metadata
+from src.services.cache import evict_clip
 
 async def setup_test_db():
     """Setup a test database in memory."""
-    reset_database()
+    await areset_database()
     db = get_database("sqlite:///:memory:", echo=False)
     await db.create_tables(metadata)
     return db
@@ -63,7 +64,7 @@ async def test_create_clip_from_dsl():
     
     # Retrieve clip
     clip = await service.get_clip_with_bars_and_notes(clip_id)
-    clip_str = json.dumps(clip, indent=2)
+    clip_str = orjson.dumps(clip, option=orjson.OPT_INDENT_2).decode()
     assert clip is not None
     assert clip["name"] == "test-clip"
     assert clip["track_name"] == "lead"
@@ -172,6 +173,147 @@ async def test_delete_clip():
     print("✓ test_delete_clip passed")
 
 @pytest.mark.asyncio
+async def test_find_clips_by_tags():
+    """Test tag search and batched loading of full clips."""
+    db = await setup_test_db()
+    service = ClipService(database=db)
+    
+    def tagged_clip(name, tags, pitches):
+        return {
+            "name": name,
+            "tags": tags,
+            "bars": [
+                {
+                    "bar_index": i,
+                    "notes": [{"absolute_pitch": p, "start": 0.0, "duration": 1.0, "is_rest": False}]
+                }
+                for i, p in enumerate(pitches)
+            ]
+        }
+    
+    jazz_id = await service.create_clip_from_dsl(tagged_clip("jazz-riff", ["jazz", "swing"], [60, 62]))
+    rock_id = await service.create_clip_from_dsl(tagged_clip("rock-riff", ["rock"], [40]))
+    await service.create_clip_from_dsl(tagged_clip("untagged", None, [50]))
+    
+    results = await service.find_clips_by_tags(["swing", "rock"])
+    assert [c["name"] for c in results] == ["jazz-riff", "rock-riff"]
+    assert [b["bar_index"] for b in results[0]["bars"]] == [0, 1]
+    assert [b["notes"][0]["pitch"] for b in results[0]["bars"]] == [60, 62]
+    assert await service.find_clips_by_tags(["metal"]) == []
+    
+    clips = await service.bulk_get_clips_with_bars_and_notes([rock_id, jazz_id, 999])
+    assert [c["id"] for c in clips] == [jazz_id, rock_id]
+    assert clips == [await service.get_clip_with_bars_and_notes(jazz_id),
+                     await service.get_clip_with_bars_and_notes(rock_id)]
+    
+    print("✓ test_find_clips_by_tags passed")
+
+@pytest.mark.asyncio
+async def test_write_through_cache_matches_database():
+    """Test that the clip cached on write equals the clip read back from the database."""
+    db = await setup_test_db()
+    service = ClipService(database=db)
+    
+    dsl_clip = {
+        "name": "cached-clip",
+        "tags": ["ambient"],
+        "bars": [
+            {
+                "bar_index": 1,
+                "notes": [
+                    {"absolute_pitch": 67, "start": 2.0, "duration": 1.0, "is_rest": False},
+                    {"absolute_pitch": 64, "start": 0.0, "duration": 2.0, "is_rest": False}
+                ]
+            },
+            {
+                "bar_index": 0,
+                "notes": [{"absolute_pitch": 60, "start": 0.0, "duration": 4.0, "is_rest": False}],
+                "velocity_curve": [{"time": 0, "value": 80}]
+            }
+        ]
+    }
+    clip_id = await service.create_clip_from_dsl(dsl_clip)
+    
+    cached = await service.get_clip_with_bars_and_notes(clip_id)
+    async with db.session() as session:
+        stored = await ClipRepository().get_tree(session, clip_id)
+    assert cached == stored
+    
+    # Returned trees are copies; mutating one does not leak into the cache
+    cached["bars"].clear()
+    assert (await service.get_clip_with_bars_and_notes(clip_id)) == stored
+    
+    await service.delete_clip(clip_id)
+    assert await service.get_clip_with_bars_and_notes(clip_id) is None
+    
+    print("✓ test_write_through_cache_matches_database passed")
+
+@pytest.mark.asyncio
+async def test_write_through_cache_has_database_shape():
+    """Test that the cached clip keeps the shape of a database read (JSON keys, floats)."""
+    db = await setup_test_db()
+    service = ClipService(database=db)
+    
+    clip_id = await service.create_clip_from_dsl({
+        "name": "shaped-clip",
+        "bars": [
+            {
+                "bar_index": 0,
+                "notes": [{"absolute_pitch": 60, "start": 0, "duration": 2, "is_rest": False}],
+                "cc": {7: 100, 10: 64}
+            }
+        ]
+    })
+    
+    cached = await service.get_clip_with_bars_and_notes(clip_id)
+    evict_clip(clip_id)
+    stored = await service.get_clip_with_bars_and_notes(clip_id)
+    assert cached == stored
+    assert cached["bars"][0]["cc"] == {"7": 100, "10": 64}
+    assert isinstance(cached["bars"][0]["notes"][0]["start_beat"], float)
+    
+    print("✓ test_write_through_cache_has_database_shape passed")
+
+@pytest.mark.asyncio
+async def test_reads_share_callers_session():
+    """Test running several service reads inside one caller-owned session."""
+    db = await setup_test_db()
+    service = ClipService(database=db)
+    
+    clip_id = await service.create_clip_from_dsl({
+        "name": "shared-session",
+        "tags": ["drums"],
+        "bars": [{"bar_index": 0, "notes": []}]
+    })
+    
+    async with db.session_unit() as session:
+        by_name = await service.find_clips_by_name("shared%", session=session)
+        by_tag = await service.find_clips_by_tags(["drums"], session=session)
+        full = await service.bulk_get_clips_with_bars_and_notes([clip_id], session=session)
+        assert session.is_active
+    
+    assert [c["id"] for c in by_name] == [clip_id]
+    assert by_tag == full
+    
+    print("✓ test_reads_share_callers_session passed")
+
+@pytest.mark.asyncio
+@pytest.mark.asyncio
+async def test_rolled_back_read_is_not_cached():
+    """Test that a clip read inside a caller's transaction is gone after its rollback."""
+    db = await setup_test_db()
+    service = ClipService(database=db)
+    
+    async with db.get_session() as session:
+        clip_id = await ClipRepository().insert(session, {"name": "uncommitted"})
+        clip = await service.get_clip_with_bars_and_notes(clip_id, session=session)
+        assert clip["name"] == "uncommitted"
+        await session.rollback()
+    
+    assert await service.get_clip_with_bars_and_notes(clip_id) is None
+    
+    print("✓ test_rolled_back_read_is_not_cached passed")
+
 async def run_all_tests():
     """Run all test cases."""
     print("Running ClipService Tests...\n")
@@ -180,7 +322,12 @@ async def run_all_tests():
         test_create_clip_from_dsl,
         test_create_multi_bar_clip,
         test_find_clips_by_name,
-        test_delete_clip
+        test_delete_clip,
+        test_find_clips_by_tags,
+        test_write_through_cache_matches_database,
+        test_write_through_cache_has_database_shape,
+        test_reads_share_callers_session,
+        test_rolled_back_read_is_not_cached
     ]
     
     passed = 0
@@ -0,0 +1,205 @@
+# test_midi_export.py
+# Unit tests for composition dict -> MIDI file export
+import io
+import sys
+from pathlib import Path
+
+import mido
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from src.services.midi_export import composition_db_dict_to_midi_bytes
+
+
+def make_composition():
+    """Build a two-track composition in DSLParser.to_database_format shape."""
+    return {
+        "composition": {"name": "test", "ticks_per_quarter": 480, "tempo_bpm": 90},
+        "clips": [
+            {
+                "id": 1,
+                "name": "lead",
+                "bars": [
+                    {
+                        "clip_id": 1,
+                        "bar_index": 0,
+                        "notes": [
+                            {"absolute_pitch": 60, "start": 0.0, "duration": 1.0, "is_rest": False},
+                            {"absolute_pitch": 0, "start": 1.0, "duration": 1.0, "is_rest": True},
+                            {"absolute_pitch": 64, "start": 2.0, "duration": 2.0, "is_rest": False},
+                        ],
+                        "velocity_curve": [{"time": 0, "value": 40}, {"time": 4, "value": 120}],
+                    }
+                ],
+            },
+            {
+                "id": 2,
+                "name": "bass",
+                "bars": [
+                    {
+                        "clip_id": 2,
+                        "bar_index": 0,
+                        "notes": [
+                            {"absolute_pitch": 36, "start": 0.5, "duration": 0.25, "is_rest": False},
+                        ],
+                    }
+                ],
+            },
+        ],
+        "tracks": [
+            {
+                "name": "Lead",
+                "bars": [
+                    {"bar_index": 1, "clip_id": 1, "clip_bar_index": 0},
+                    {"bar_index": 2, "clip_id": 1, "clip_bar_index": 0},
+                ],
+            },
+            {
+                "name": "Bass",
+                "bars": [
+                    {"bar_index": 2, "clip_id": 2, "clip_bar_index": 0},
+                    {"bar_index": 3, "clip_id": 99, "clip_bar_index": 0},  # missing clip is skipped
+                ],
+            },
+        ],
+    }
+
+
+def absolute_notes(track):
+    """Return (tick, type, note, velocity, channel) for each note message in a track."""
+    tick = 0
+    events = []
+    for msg in track:
+        tick += msg.time
+        if msg.type in ("note_on", "note_off"):
+            events.append((tick, msg.type, msg.note, msg.velocity, msg.channel))
+    return events
+
+
+def test_export_places_notes_on_absolute_ticks():
+    """Test tick placement, rests, velocity curves, channels and the conductor track."""
+    midi = mido.MidiFile(file=io.BytesIO(composition_db_dict_to_midi_bytes(make_composition())))
+
+    assert midi.ticks_per_beat == 480
+    assert len(midi.tracks) == 3
+
+    conductor, lead, bass = midi.tracks
+    assert lead.name == "Lead" and bass.name == "Bass"
+    assert [(m.type, m.time) for m in conductor] == [
+        ("set_tempo", 0), ("time_signature", 0), ("end_of_track", 0)
+    ]
+    assert conductor[0].tempo == mido.bpm2tempo(90)
+    assert (conductor[1].numerator, conductor[1].denominator) == (4, 4)
+    assert not [m for m in lead if m.type == "set_tempo"]
+    assert not [m for m in bass if m.type == "set_tempo"]
+
+    assert absolute_notes(lead) == [
+        (0, "note_on", 60, 40, 0),
+        (480, "note_off", 60, 0, 0),
+        (960, "note_on", 64, 80, 0),
+        (1920, "note_off", 64, 0, 0),
+        (1920, "note_on", 60, 40, 0),
+        (2400, "note_off", 60, 0, 0),
+        (2880, "note_on", 64, 80, 0),
+        (3840, "note_off", 64, 0, 0),
+    ]
+    assert absolute_notes(bass) == [
+        (2160, "note_on", 36, 100, 1),
+        (2280, "note_off", 36, 0, 1),
+    ]
+
+    print("✓ test_export_places_notes_on_absolute_ticks passed")
+
+
+def test_export_empty_track():
+    """Test that a track without bars still gets its name after the conductor track."""
+    data = {"composition": {"name": "empty"}, "tracks": [{"name": "Solo", "bars": []}]}
+    midi = mido.MidiFile(file=io.BytesIO(composition_db_dict_to_midi_bytes(data)))
+
+    conductor, track = midi.tracks
+    assert [m.type for m in conductor if m.type == "set_tempo"] == ["set_tempo"]
+    assert track.name == "Solo"
+    assert absolute_notes(track) == []
+
+    print("✓ test_export_empty_track passed")
+
+
+def test_export_prunes_rests_and_empty_notes():
+    """Test that rests and notes without a positive duration emit no events."""
+    data = make_composition()
+    data["clips"][1]["bars"][0]["notes"] += [
+        {"absolute_pitch": 38, "start": 1.0, "duration": 0.0, "is_rest": False},
+        {"absolute_pitch": 40, "start": 2.0, "duration": -1.0, "is_rest": False},
+        {"absolute_pitch": 0, "start": 3.0, "duration": 1.0, "is_rest": True},
+    ]
+    midi = mido.MidiFile(file=io.BytesIO(composition_db_dict_to_midi_bytes(data)))
+
+    assert absolute_notes(midi.tracks[2]) == [
+        (2160, "note_on", 36, 100, 1),
+        (2280, "note_off", 36, 0, 1),
+    ]
+
+    print("✓ test_export_prunes_rests_and_empty_notes passed")
+
+
+def test_export_rejects_out_of_range_pitch():
+    """Test that invalid MIDI data bytes still raise, as mido validation would."""
+    data = make_composition()
+    data["clips"][1]["bars"][0]["notes"][0]["absolute_pitch"] = 128
+
+    with pytest.raises(ValueError):
+        composition_db_dict_to_midi_bytes(data)
+
+    print("✓ test_export_rejects_out_of_range_pitch passed")
+
+
+def test_export_cache_follows_content():
+    """Test that equal dicts reuse the cached bytes and edited dicts are re-exported."""
+    data = make_composition()
+    first = composition_db_dict_to_midi_bytes(data)
+
+    assert composition_db_dict_to_midi_bytes(make_composition()) is first
+
+    data["clips"][0]["bars"][0]["notes"][0]["absolute_pitch"] = 72
+    edited = mido.MidiFile(file=io.BytesIO(composition_db_dict_to_midi_bytes(data)))
+    assert absolute_notes(edited.tracks[1])[0] == (0, "note_on", 72, 40, 0)
+
+    print("✓ test_export_cache_follows_content passed")
+
+
+def run_all_tests():
+    """Run all test cases."""
+    print("Running MIDI Export Tests...\n")
+
+    tests = [
+        test_export_places_notes_on_absolute_ticks,
+        test_export_empty_track,
+        test_export_prunes_rests_and_empty_notes,
+        test_export_rejects_out_of_range_pitch,
+        test_export_cache_follows_content,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__name__} failed: {e}")
+            failed += 1
+
+    print(f"\n{'='*50}")
+    print(f"Tests passed: {passed}/{passed + failed}")
+    print(f"Tests failed: {failed}/{passed + failed}")
+    print(f"{'='*50}")
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)